@@ -1,33 +1,200 @@
+from hashlib import md5
+
 from django.contrib import admin
+from django.contrib.admin import helpers
+from django.db.models.expressions import RawSQL
+from django.template.response import TemplateResponse
 
 from .models import Category, Comment, Location, Post
+from .moderation import delete_objects, set_published
+from .search import SEARCH_TABLE, build_match_query, search_supported
+from .utils import CachedCountPaginator, count_generation_key
+
+
+class EstimatedCountPaginator(CachedCountPaginator):
+    """Paginator списков админки без COUNT(*) по большим таблицам.
+
+    Число строк кешируется по тексту запроса в поколении своей модели,
+    а для таблиц больше COUNT_ESTIMATE_THRESHOLD берётся оценка СУБД.
+    """
+
+    def __init__(self, object_list, per_page, orphans=0,
+                 allow_empty_first_page=True):
+        sql, params = object_list.query.sql_with_params()
+        scope = 'admin:' + md5(f'{sql}{params}'.encode()).hexdigest()
+        super().__init__(object_list, per_page, scope=scope, estimate=True,
+                         generation_key=count_generation_key(
+                             object_list.model
+                         ),
+                         orphans=orphans,
+                         allow_empty_first_page=allow_empty_first_page)
+
+
+class InputFilter(admin.SimpleListFilter):
+    """Фильтр с полем ввода вместо списка всех связанных объектов."""
+
+    template = 'admin/input_filter.html'
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def has_output(self):
+        return True
+
+    def choices(self, changelist):
+        yield {
+            'value': self.value() or '',
+            'parameter_name': self.parameter_name,
+            'query_string': changelist.get_query_string(
+                remove=[self.parameter_name]
+            ),
+            'hidden': [
+                (key, value) for key, value in changelist.params.items()
+                if key not in (self.parameter_name, 'p')
+            ],
+        }
+
+
+class AuthorFilter(InputFilter):
+    title = 'автору (логин)'
+    parameter_name = 'author'
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(author__username=self.value())
+        return queryset
+
+
+class CategoryFilter(InputFilter):
+    title = 'категории (идентификатор)'
+    parameter_name = 'category'
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(category__slug=self.value())
+        return queryset
 
 
-class PublishedModelAdmin(admin.ModelAdmin):
+class LocationFilter(InputFilter):
+    title = 'местоположению (id)'
+    parameter_name = 'location'
+
+    def queryset(self, request, queryset):
+        if self.value() and self.value().isdigit():
+            return queryset.filter(location_id=self.value())
+        return queryset
+
+
+@admin.action(description='Опубликовать выбранные', permissions=['change'])
+def publish_selected(modeladmin, request, queryset):
+    changed = set_published(queryset, True)
+    modeladmin.message_user(request, f'Опубликовано: {changed}')
+
+
+@admin.action(description='Снять с публикации выбранные',
+              permissions=['change'])
+def unpublish_selected(modeladmin, request, queryset):
+    changed = set_published(queryset, False)
+    modeladmin.message_user(request, f'Снято с публикации: {changed}')
+
+
+@admin.action(description='Удалить выбранные', permissions=['delete'])
+def delete_selected_in_bulk(modeladmin, request, queryset):
+    """Удалить пачками после подтверждения, не перечисляя объекты."""
+    if request.POST.get('post') == 'yes':
+        deleted = delete_objects(queryset)
+        modeladmin.message_user(request, f'Удалено: {deleted}')
+        return None
+    opts = modeladmin.model._meta
+    return TemplateResponse(request, 'admin/bulk_delete_confirmation.html', {
+        **modeladmin.admin_site.each_context(request),
+        'title': 'Вы уверены?',
+        'opts': opts,
+        'count': queryset.count(),
+        'selected': request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+        'select_across': request.POST.get('select_across', '0'),
+        'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+    })
+
+
+class BulkModerationAdmin(admin.ModelAdmin):
+    """Массовые действия одним UPDATE/DELETE на пачку вместо поштучных."""
+
+    actions = [delete_selected_in_bulk]
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+
+class PublishedModelAdmin(BulkModerationAdmin):
     list_display = ['is_published', 'created_at']
     list_filter = ['is_published', 'created_at']
-    search_fields = ['created_at']
+    actions = [publish_selected, unpublish_selected, delete_selected_in_bulk]
 
 
 @admin.register(Category)
 class CategoryAdmin(PublishedModelAdmin):
+    list_display = ['title', 'slug', 'is_published', 'created_at']
+    search_fields = ['title', 'slug']
     prepopulated_fields = {'slug': ('title',)}
 
 
 @admin.register(Location)
 class LocationAdmin(PublishedModelAdmin):
-    pass
+    list_display = ['name', 'is_published', 'created_at']
+    search_fields = ['name']
 
 
 @admin.register(Post)
 class PostAdmin(PublishedModelAdmin):
-    list_filter = ['is_published', 'created_at', 'author',
-                   'category', 'location']
-    date_hierarchy = 'created_at'
+    list_display = ['title', 'author', 'category', 'pub_date',
+                    'is_published', 'comment_count']
+    list_filter = ['is_published', 'is_live', AuthorFilter,
+                   CategoryFilter, LocationFilter]
+    list_select_related = ['category']
+    autocomplete_fields = ['author', 'category', 'location']
+    search_fields = ['title']
+    ordering = ['-pk']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        # Авторов — отдельным запросом по id со страницы: с JOIN на
+        # auth_user SQLite может начать план с пользователей и
+        # сортировать все посты вместо обхода по первичному ключу.
+        return super().get_queryset(request).prefetch_related('author')
+
+    def get_search_results(self, request, queryset, search_term):
+        """Искать по полнотекстовому индексу, а не LIKE '%…%'."""
+        if not search_supported():
+            return super().get_search_results(request, queryset, search_term)
+        match = build_match_query(search_term)
+        if match is None:
+            return queryset, False
+        return queryset.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s',
+            [match],
+        )), False
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(BulkModerationAdmin):
     list_display = ['text', 'post', 'created_at', 'author']
-    list_filter = ['created_at', 'author']
-    search_fields = ['text', 'author__username', 'post__title']
+    list_filter = ['created_at', AuthorFilter]
+    list_select_related = ['post', 'author']
+    raw_id_fields = ['post', 'author']
+    search_fields = ['=post__id']
+    ordering = ['-pk']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        """Номер поста ищется по индексу, иначе — логин автора целиком."""
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        if search_term.isdigit():
+            return queryset.filter(post_id=search_term), False
+        return queryset.filter(author__username=search_term), False
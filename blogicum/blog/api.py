@@ -0,0 +1,260 @@
+"""JSON API только для чтения: публикации, комментарии, категории, места.
+
+Видимость та же, что у HTML-страниц (get_published_posts).
+Ответы собираются из строк values_list без создания моделей, в запрос
+попадают только поля из ?fields=, а страницы листаются курсором по
+(дата, id) без OFFSET. Ответы кешируются целиком через cache_public_page
+с теми же тегами, что и страницы, поэтому повторный опрос не доходит
+до ORM, а с If-None-Match получает 304.
+"""
+from django.db.models import Q
+from django.http import JsonResponse
+from django.views.decorators.http import require_safe
+
+from blog.instrumentation import query_budget
+from blog.models import Category, Comment, Location
+from blog.page_cache import cache_public_page, tag_page
+from blog.storage import post_image_storage
+from blog.utils import decode_cursor, encode_key, get_published_posts
+
+
+API_PAGE_SIZE = 20
+API_MAX_PAGE_SIZE = 100
+
+
+class ApiError(Exception):
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _image_url(name):
+    return post_image_storage.url(name) if name else None
+
+
+class Resource:
+    """Набор объектов API: поля, порядок выдачи и теги кеша.
+
+    fields — имя поля в ответе и путь для values_list; row_tags — поля
+    строки, по которым ставятся теги кеша, и префиксы этих тегов.
+    """
+
+    fields = {}
+    converters = {}
+    date_field = 'created_at'
+    descending = False
+    row_tags = {}
+    budget = 1
+
+    def get_queryset(self, request, **kwargs):
+        raise NotImplementedError
+
+    def tags(self, request, **kwargs):
+        return ()
+
+    def select(self, request):
+        """Имена и пути полей из ?fields=, по умолчанию — все."""
+        requested = request.GET.get('fields')
+        if not requested:
+            return list(self.fields)
+        names = list(dict.fromkeys(
+            name.strip() for name in requested.split(',') if name.strip()
+        ))
+        unknown = [name for name in names if name not in self.fields]
+        if unknown or not names:
+            raise ApiError(
+                f"Неизвестные поля: {', '.join(unknown) or requested}. "
+                f"Доступны: {', '.join(self.fields)}."
+            )
+        return names
+
+    def serialize(self, rows, names, offset):
+        """Словари ответа из кортежей values_list, начиная с offset."""
+        converters = [
+            (name, self.converters[name]) for name in names
+            if name in self.converters
+        ]
+        results = []
+        for row in rows:
+            item = dict(zip(names, row[offset:]))
+            for name, convert in converters:
+                item[name] = convert(item[name])
+            results.append(item)
+        return results
+
+    def values(self, queryset, names):
+        """values_list со служебными полями впереди; вернуть и их число."""
+        service = [self.date_field, 'pk', *self.row_tags]
+        lookups = [self.fields[name] for name in names]
+        return queryset.values_list(*service, *lookups), len(service)
+
+    def tag_rows(self, request, rows):
+        prefixes = list(self.row_tags.values())
+        tag_page(request, {
+            f'{prefix}:{value}'
+            for row in rows
+            for prefix, value in zip(prefixes, row[2:])
+            if prefix and value is not None
+        })
+
+    def page(self, request, queryset, names):
+        after = request.GET.get('after')
+        limit = request.GET.get('limit', str(API_PAGE_SIZE))
+        if not limit.isdigit() or not 0 < int(limit) <= API_MAX_PAGE_SIZE:
+            raise ApiError(
+                f'limit должен быть от 1 до {API_MAX_PAGE_SIZE}.'
+            )
+        limit = int(limit)
+        if after:
+            key = decode_cursor(after)
+            if key is None:
+                raise ApiError('Некорректный курсор after.')
+            moment, pk = key
+            sign = 'lt' if self.descending else 'gt'
+            queryset = queryset.filter(
+                Q(**{f'{self.date_field}__{sign}': moment})
+                | Q(**{self.date_field: moment, f'pk__{sign}': pk})
+            )
+        prefix = '-' if self.descending else ''
+        queryset = queryset.order_by(f'{prefix}{self.date_field}',
+                                     f'{prefix}pk')
+        values, offset = self.values(queryset, names)
+        rows = list(values[:limit + 1])
+        next_url = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            query = request.GET.copy()
+            query['after'] = encode_key(*rows[-1][:2])
+            next_url = f'{request.path}?{query.urlencode()}'
+        self.tag_rows(request, rows)
+        return {
+            'results': self.serialize(rows, names, offset),
+            'next': next_url,
+        }
+
+    def list_view(self, request, **kwargs):
+        names = self.select(request)
+        tag_page(request, *self.tags(request, **kwargs))
+        return self.page(request, self.get_queryset(request, **kwargs),
+                         names)
+
+    def detail_view(self, request, pk, **kwargs):
+        names = self.select(request)
+        values, offset = self.values(
+            self.get_queryset(request, **kwargs).filter(pk=pk), names
+        )
+        row = values.first()
+        if row is None:
+            raise ApiError('Не найдено.', status=404)
+        self.tag_rows(request, [row])
+        return self.serialize([row], names, offset)[0]
+
+
+class PostResource(Resource):
+    fields = {
+        'id': 'pk',
+        'title': 'title',
+        'text': 'text',
+        'pub_date': 'pub_date',
+        'updated_at': 'updated_at',
+        'author': 'author__username',
+        'category': 'category__slug',
+        'location': 'location__name',
+        'image': 'image',
+        'comment_count': 'comment_count',
+    }
+    converters = {'image': _image_url}
+    date_field = 'pub_date'
+    descending = True
+    row_tags = {
+        'pk': 'post', 'author_id': 'user',
+        'category_id': 'category', 'location_id': 'location',
+    }
+
+    def get_queryset(self, request):
+        posts = get_published_posts()
+        if request.GET.get('category'):
+            posts = posts.filter(category__slug=request.GET['category'])
+        if request.GET.get('author'):
+            posts = posts.filter(author__username=request.GET['author'])
+        return posts
+
+    def tags(self, request):
+        return ('feeds', 'feed')
+
+
+class CommentResource(Resource):
+    fields = {
+        'id': 'pk',
+        'post': 'post_id',
+        'text': 'text',
+        'created_at': 'created_at',
+        'author': 'author__username',
+    }
+    row_tags = {'author_id': 'user'}
+    budget = 2
+
+    def get_queryset(self, request, post_id):
+        return Comment.objects.filter(post_id=post_id)
+
+    def tags(self, request, post_id):
+        return ('feeds', f'post:{post_id}')
+
+    def list_view(self, request, post_id):
+        if not get_published_posts().filter(pk=post_id).exists():
+            raise ApiError('Не найдено.', status=404)
+        return super().list_view(request, post_id=post_id)
+
+
+class CategoryResource(Resource):
+    fields = {
+        'id': 'pk',
+        'title': 'title',
+        'slug': 'slug',
+        'description': 'description',
+        'created_at': 'created_at',
+    }
+
+    def get_queryset(self, request):
+        return Category.objects.filter(is_published=True)
+
+    def tags(self, request):
+        return ('feeds',)
+
+
+class LocationResource(Resource):
+    fields = {
+        'id': 'pk',
+        'name': 'name',
+        'created_at': 'created_at',
+    }
+    row_tags = {'pk': 'location'}
+
+    def get_queryset(self, request):
+        return Location.objects.filter(is_published=True)
+
+    def tags(self, request):
+        return ('locations',)
+
+
+def api_view(resource, method):
+    handler = getattr(resource, method)
+
+    @require_safe
+    def view(request, **kwargs):
+        try:
+            data = handler(request, **kwargs)
+        except ApiError as error:
+            return JsonResponse({'error': str(error)}, status=error.status,
+                                json_dumps_params={'ensure_ascii': False})
+        return JsonResponse(data, json_dumps_params={'ensure_ascii': False})
+
+    return query_budget(resource.budget)(cache_public_page(view))
+
+
+posts = api_view(PostResource(), 'list_view')
+post_detail = api_view(PostResource(), 'detail_view')
+post_comments = api_view(CommentResource(), 'list_view')
+categories = api_view(CategoryResource(), 'list_view')
+locations = api_view(LocationResource(), 'list_view')
@@ -0,0 +1,182 @@
+"""Потоковая выгрузка контента в JSONL, сжатый gzip, для аналитики.
+
+Каждая модель пишется в свой файл <app>.<model>.jsonl.gz. Строки
+читаются через values() пачками по первичному ключу (pk > последнего
+выгруженного), и каждая пачка дописывается в файл отдельным gzip-членом:
+gzip-файл из нескольких членов читается как один поток, а незаконченный
+член после сбоя просто отрезается при возобновлении.
+
+Состояние выгрузки лежит рядом в export-state.json: для каждой модели —
+граница until (наибольший pk на момент старта), позиция after и длина
+файла после последней записанной пачки. Граница законченной выгрузки
+служит водяным знаком для следующей, инкрементальной.
+"""
+import gzip
+import json
+import os
+import time
+from datetime import date, datetime, time as dt_time
+from decimal import Decimal
+from uuid import UUID
+
+from django.contrib.auth import get_user_model
+from django.db.models import Max
+
+from blog.models import Category, Comment, Location, Post
+
+
+User = get_user_model()
+
+EXPORT_CHUNK_SIZE = 5000
+STATE_FILE = 'export-state.json'
+
+# Модели в порядке зависимостей и поля, которые в выгрузку не попадают.
+EXPORT_MODELS = [
+    (User, {'password', 'email'}),
+    (Category, set()),
+    (Location, set()),
+    (Post, set()),
+    (Comment, set()),
+]
+
+
+class ExportStateError(Exception):
+    pass
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date, dt_time)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    raise TypeError(f'{type(value).__name__} не сериализуется в JSON')
+
+
+def export_path(directory, model):
+    return os.path.join(directory, f'{model._meta.label_lower}.jsonl.gz')
+
+
+def read_state(directory):
+    path = os.path.join(directory, STATE_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def write_state(directory, state):
+    """Записать состояние атомарно: сбой не оставит его наполовину."""
+    path = os.path.join(directory, STATE_FILE)
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w', encoding='utf-8') as file:
+        json.dump(state, file, indent=2)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, path)
+
+
+class ContentExporter:
+    """Выгрузить модели EXPORT_MODELS в каталог directory.
+
+    watermark — {метка модели: pk} из прошлой законченной выгрузки:
+    тогда выгружаются только строки, созданные после неё.
+    """
+
+    def __init__(self, directory, chunk_size=EXPORT_CHUNK_SIZE,
+                 compresslevel=6):
+        self.directory = directory
+        self.chunk_size = chunk_size
+        self.compresslevel = compresslevel
+        self.stats = {}
+
+    def start(self, watermark=None):
+        """Начать новую выгрузку и вернуть её состояние."""
+        if read_state(self.directory) is not None:
+            raise ExportStateError(
+                f'В {self.directory} уже есть выгрузка; '
+                'продолжите её с --resume или выберите другой каталог.'
+            )
+        os.makedirs(self.directory, exist_ok=True)
+        watermark = watermark or {}
+        state = {'finished': False, 'models': {}}
+        for model, _ in EXPORT_MODELS:
+            label = model._meta.label_lower
+            until = model._base_manager.aggregate(
+                until=Max('pk')
+            )['until'] or 0
+            after = watermark.get(label, 0)
+            state['models'][label] = {
+                'after': after, 'until': max(until, after),
+                'bytes': 0, 'rows': 0,
+            }
+            open(export_path(self.directory, model), 'wb').close()
+        write_state(self.directory, state)
+        return state
+
+    def resume(self):
+        state = read_state(self.directory)
+        if state is None:
+            raise ExportStateError(f'В {self.directory} нет выгрузки.')
+        if state['finished']:
+            raise ExportStateError(f'Выгрузка в {self.directory} закончена.')
+        return state
+
+    def run(self, state):
+        for model, excluded in EXPORT_MODELS:
+            self.export_model(state, model, excluded)
+        state['finished'] = True
+        write_state(self.directory, state)
+        return state
+
+    def export_model(self, state, model, excluded):
+        label = model._meta.label_lower
+        progress = state['models'][label]
+        path = export_path(self.directory, model)
+        fields = [
+            field.attname for field in model._meta.concrete_fields
+            if field.name not in excluded
+        ]
+        rows = model._base_manager.filter(
+            pk__lte=progress['until']
+        ).order_by('pk').values_list(*fields)
+        pk_index = fields.index(model._meta.pk.attname)
+        stats = self.stats.setdefault(label, {'rows': 0, 'seconds': 0.0})
+        started = time.perf_counter()
+        with open(path, 'r+b') as file:
+            # Всё, что записано после последней сохранённой пачки, —
+            # хвост прерванной выгрузки; он будет записан заново.
+            file.truncate(progress['bytes'])
+            file.seek(progress['bytes'])
+            while True:
+                batch = list(
+                    rows.filter(pk__gt=progress['after'])[:self.chunk_size]
+                )
+                if not batch:
+                    break
+                lines = ''.join(
+                    json.dumps(dict(zip(fields, row)), ensure_ascii=False,
+                               default=_json_default) + '\n'
+                    for row in batch
+                )
+                file.write(gzip.compress(lines.encode(), self.compresslevel))
+                file.flush()
+                os.fsync(file.fileno())
+                progress['after'] = batch[-1][pk_index]
+                progress['bytes'] = file.tell()
+                progress['rows'] += len(batch)
+                stats['rows'] += len(batch)
+                write_state(self.directory, state)
+        stats['seconds'] += time.perf_counter() - started
+
+
+def finished_watermark(directory):
+    """Границы законченной выгрузки — водяной знак для следующей."""
+    state = read_state(directory)
+    if state is None or not state['finished']:
+        raise ExportStateError(
+            f'В {directory} нет законченной выгрузки для водяного знака.'
+        )
+    return {
+        label: progress['until']
+        for label, progress in state['models'].items()
+    }
@@ -0,0 +1,146 @@
+"""RSS и Atom для всей ленты, категорий и авторов.
+
+Ленты собираются из тех же запросов, что и HTML-страницы, и кешируются
+целиком через cache_public_page с тегами ленты: пока теги не сменились,
+опрос агрегатора не доходит до ORM, а с If-None-Match получает 304.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.syndication.views import Feed
+from django.shortcuts import get_object_or_404
+from django.template.defaultfilters import truncatewords
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+
+from blog.instrumentation import query_budget
+from blog.models import Category
+from blog.page_cache import cache_public_page, post_tags, tag_page
+from blog.utils import get_published_posts
+
+
+User = get_user_model()
+
+FEED_SIZE = 20
+
+
+class FeedSource:
+
+    def __init__(self, title, link, description, items):
+        self.title = title
+        self.link = link
+        self.description = description
+        self.items = items
+
+
+class PostsFeed(Feed):
+    """Последние опубликованные посты; какие — решает get_source()."""
+
+    def get_source(self, request, **kwargs):
+        """Вернуть (заголовок, ссылка, описание, queryset, теги)."""
+        raise NotImplementedError
+
+    def get_object(self, request, **kwargs):
+        title, link, description, posts, tags = self.get_source(
+            request, **kwargs
+        )
+        tag_page(request, 'feeds', *tags)
+        items = list(posts.order_by('-pub_date', '-pk')[:FEED_SIZE])
+        tag_page(request, post_tags(items))
+        return FeedSource(title, link, description, items)
+
+    def title(self, source):
+        return source.title
+
+    def link(self, source):
+        return source.link
+
+    def description(self, source):
+        return source.description
+
+    def subtitle(self, source):
+        return source.description
+
+    def items(self, source):
+        return source.items
+
+    def item_title(self, post):
+        return post.title
+
+    def item_description(self, post):
+        return truncatewords(post.text, 60)
+
+    def item_link(self, post):
+        return reverse('blog:post_detail', args=[post.pk])
+
+    def item_pubdate(self, post):
+        return post.pub_date
+
+    def item_updateddate(self, post):
+        return post.updated_at
+
+    def item_author_name(self, post):
+        return post.author.get_username()
+
+    def item_categories(self, post):
+        return [post.category.title] if post.category else []
+
+
+class LatestPostsFeed(PostsFeed):
+
+    def get_source(self, request):
+        return (
+            'Блогикум — новые публикации', reverse('blog:index'),
+            'Последние публикации всех авторов.',
+            get_published_posts(), ['feed'],
+        )
+
+
+class CategoryPostsFeed(PostsFeed):
+
+    def get_source(self, request, category_slug):
+        category = get_object_or_404(
+            Category, slug=category_slug, is_published=True
+        )
+        return (
+            f'Блогикум — {category.title}',
+            reverse('blog:category_posts', args=[category.slug]),
+            category.description,
+            get_published_posts().filter(category=category),
+            [f'category-feed:{category.pk}', f'category:{category.pk}'],
+        )
+
+
+class AuthorPostsFeed(PostsFeed):
+
+    def get_source(self, request, username):
+        author = get_object_or_404(User, username=username)
+        return (
+            f'Блогикум — публикации {author.get_username()}',
+            reverse('blog:profile', args=[author.get_username()]),
+            f'Публикации пользователя {author.get_username()}.',
+            get_published_posts().filter(author=author),
+            [f'user-feed:{author.pk}', f'user:{author.pk}'],
+        )
+
+
+class LatestPostsAtomFeed(LatestPostsFeed):
+    feed_type = Atom1Feed
+
+
+class CategoryPostsAtomFeed(CategoryPostsFeed):
+    feed_type = Atom1Feed
+
+
+class AuthorPostsAtomFeed(AuthorPostsFeed):
+    feed_type = Atom1Feed
+
+
+def feed_view(feed):
+    return query_budget(4)(cache_public_page(feed))
+
+
+latest_posts_rss = feed_view(LatestPostsFeed())
+latest_posts_atom = feed_view(LatestPostsAtomFeed())
+category_posts_rss = feed_view(CategoryPostsFeed())
+category_posts_atom = feed_view(CategoryPostsAtomFeed())
+author_posts_rss = feed_view(AuthorPostsFeed())
+author_posts_atom = feed_view(AuthorPostsAtomFeed())
@@ -0,0 +1,332 @@
+"""Потоковая загрузка фикстур формата dumpdata (db.json) пачками.
+
+loaddata читает фикстуру целиком и сохраняет объекты по одному. Здесь
+JSON-массив разбирается по мере чтения файла, объекты копятся по
+моделям и вставляются пачками многострочным INSERT, каждая пачка — в
+своей транзакции. Вставка идёт в режиме raw, как у loaddata: save() и
+сигналы не вызываются, а auto_now/auto_now_add не перетирают даты из
+фикстуры. Внешние ключи пачки проверяются до её фиксации, поэтому
+ссылаться можно только на объекты из той же или более ранних пачек —
+dumpdata так и упорядочивает модели.
+"""
+import gzip
+import json
+import time
+
+from django.core import serializers
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+
+from blog.models import Post
+from blog.page_cache import invalidate_tags
+from blog.search import rebuild_search_index, search_supported
+from blog.utils import (
+    invalidate_feed_counts, recount_comment_counts, remember_next_release,
+)
+
+
+READ_SIZE = 1024 * 1024
+IMPORT_BATCH_SIZE = 5000
+
+
+class FixtureFormatError(ValueError):
+    pass
+
+
+def open_fixture(path):
+    """Открыть фикстуру как текст; .gz распаковывается на лету."""
+    if str(path).endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, encoding='utf-8')
+
+
+class _ArrayReader:
+    """Буфер над текстовым потоком: отдаёт символы и JSON-объекты."""
+
+    def __init__(self, stream, read_size):
+        self.stream = stream
+        self.read_size = read_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.position = 0
+
+    def _read(self):
+        chunk = self.stream.read(self.read_size)
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        return bool(chunk)
+
+    def peek(self):
+        """Следующий непробельный символ или None в конце файла."""
+        while True:
+            while (self.position < len(self.buffer)
+                   and self.buffer[self.position].isspace()):
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self._read():
+                return None
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise FixtureFormatError(f'Ожидался {char!r}, а не {found!r}.')
+        self.position += 1
+
+    def read_object(self):
+        if self.peek() != '{':
+            raise FixtureFormatError(
+                f'Ожидался объект, а не {self.peek()!r}.'
+            )
+        while True:
+            try:
+                record, self.position = self.decoder.raw_decode(
+                    self.buffer, self.position
+                )
+                return record
+            except json.JSONDecodeError:
+                if not self._read():
+                    raise FixtureFormatError('Некорректный JSON в фикстуре.')
+
+
+def iter_fixture_records(stream, read_size=READ_SIZE):
+    """Отдавать объекты верхнего уровня JSON-массива по одному.
+
+    В памяти держится только непрочитанный хвост буфера, поэтому размер
+    файла не важен — важен размер самой большой записи.
+    """
+    reader = _ArrayReader(stream, read_size)
+    if reader.peek() is None:
+        return
+    reader.expect('[')
+    if reader.peek() == ']':
+        return
+    while True:
+        yield reader.read_object()
+        if reader.peek() == ']':
+            return
+        reader.expect(',')
+
+
+class ModelStats:
+
+    def __init__(self):
+        self.rows = 0
+        self.seconds = 0.0
+
+    @property
+    def rate(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+class FixtureImporter:
+    """Копить объекты по моделям и вставлять их пачками.
+
+    С defer_indexes обычные (не уникальные) индексы таблицы удаляются
+    перед первой вставкой в неё и создаются заново в finish(): один
+    проход построения индекса дешевле, чем обновлять его на каждой
+    строке. Пока это поддержано только для SQLite.
+    """
+
+    def __init__(self, batch_size=IMPORT_BATCH_SIZE, skip_existing=False,
+                 defer_indexes=False, using=DEFAULT_DB_ALIAS):
+        self.batch_size = batch_size
+        self.skip_existing = skip_existing
+        self.using = using
+        self.connection = connections[using]
+        if defer_indexes and self.connection.vendor != 'sqlite':
+            raise ValueError(
+                'Отложенные индексы поддержаны только для SQLite.'
+            )
+        self.defer_indexes = defer_indexes
+        self.buffers = {}
+        self.pending = 0
+        self.stats = {}
+        self.dropped_indexes = {}
+
+    def add(self, deserialized):
+        model = type(deserialized.object)
+        self.buffers.setdefault(model, []).append(deserialized)
+        self.pending += 1
+        if self.pending >= self.batch_size:
+            self.flush()
+
+    def load(self, records, ignorenonexistent=False, exclude=()):
+        """Загрузить записи фикстуры; exclude — метки 'app.model'."""
+        exclude = {label.lower() for label in exclude}
+        records = (
+            record for record in records
+            if record.get('model', '').lower() not in exclude
+        )
+        for deserialized in serializers.deserialize(
+            'python', records, using=self.using,
+            ignorenonexistent=ignorenonexistent,
+        ):
+            self.add(deserialized)
+        self.flush()
+
+    def flush(self):
+        """Вставить накопленное одной транзакцией, проверив внешние ключи.
+
+        Если в пачке есть ссылка на несуществующий объект, транзакция
+        откатывается с IntegrityError, а в базе остаются только прежние,
+        целостные пачки; self.stats считает лишь зафиксированные строки.
+        """
+        if not self.pending:
+            return
+        models = [model for model, objects in self.buffers.items() if objects]
+        for model in models:
+            self._drop_indexes(model)
+        inserted = []
+        with transaction.atomic(using=self.using):
+            for model in models:
+                started = time.perf_counter()
+                rows = self._insert(model, self.buffers[model])
+                inserted.append(
+                    (model, rows, time.perf_counter() - started)
+                )
+            self.check_constraints(models)
+        for model, rows, seconds in inserted:
+            stats = self.stats.setdefault(model._meta.label, ModelStats())
+            stats.rows += rows
+            stats.seconds += seconds
+        self.buffers = {model: [] for model in self.buffers}
+        self.pending = 0
+
+    def finish(self):
+        """Дописать остаток и вернуть удалённые индексы."""
+        try:
+            self.flush()
+        finally:
+            self.restore_indexes()
+
+    def _insert(self, model, objects):
+        """Вставить объекты модели и их связи; вернуть число строк."""
+        for item in objects:
+            if item.m2m_data and item.object.pk is None:
+                raise FixtureFormatError(
+                    f'У объекта {model._meta.label} со связями '
+                    'многие-ко-многим нет pk.'
+                )
+        fields = model._meta.local_concrete_fields
+        # В старых дампах может не быть полей, добавленных позже, —
+        # даты с auto_now/auto_now_add заполняются так же, как при save().
+        auto_dates = [
+            field for field in fields
+            if getattr(field, 'auto_now', False)
+            or getattr(field, 'auto_now_add', False)
+        ]
+        for item in objects:
+            for field in auto_dates:
+                if getattr(item.object, field.attname) is None:
+                    field.pre_save(item.object, add=True)
+        with_pk = [item.object for item in objects
+                   if item.object.pk is not None]
+        without_pk = [item.object for item in objects
+                      if item.object.pk is None]
+        self._insert_rows(model, with_pk, fields)
+        self._insert_rows(model, without_pk, [
+            field for field in fields if field is not model._meta.pk
+        ])
+        return len(objects) + self._insert_m2m(model, objects)
+
+    def _insert_rows(self, model, objs, fields):
+        if not objs:
+            return
+        ops = self.connection.ops
+        size = max(min(self.batch_size, ops.bulk_batch_size(fields, objs)), 1)
+        for start in range(0, len(objs), size):
+            model._base_manager._insert(
+                objs[start:start + size], fields=fields, using=self.using,
+                raw=True, ignore_conflicts=self.skip_existing,
+            )
+
+    def _insert_m2m(self, model, objects):
+        inserted = 0
+        for field in model._meta.many_to_many:
+            through = field.remote_field.through
+            source = f'{field.m2m_field_name()}_id'
+            target = f'{field.m2m_reverse_field_name()}_id'
+            links = [
+                through(**{source: item.object.pk, target: pk})
+                for item in objects
+                for pk in (item.m2m_data or {}).get(field.name, ())
+            ]
+            if links:
+                through._base_manager.using(self.using).bulk_create(
+                    links, batch_size=self.batch_size,
+                    ignore_conflicts=self.skip_existing,
+                )
+                inserted += len(links)
+        return inserted
+
+    def _drop_indexes(self, model):
+        tables = [model._meta.db_table] + [
+            field.remote_field.through._meta.db_table
+            for field in model._meta.many_to_many
+        ]
+        for table in tables:
+            if self.defer_indexes and table not in self.dropped_indexes:
+                self._drop_table_indexes(table)
+
+    def _drop_table_indexes(self, table):
+        # Вне транзакции пачки: если она откатится, индексы всё равно
+        # будут удалены, и finish() восстановит их ровно один раз.
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT name, sql FROM sqlite_master WHERE type = 'index' "
+                'AND tbl_name = %s AND sql IS NOT NULL', [table],
+            )
+            indexes = [
+                (name, sql) for name, sql in cursor.fetchall()
+                if not sql.upper().startswith('CREATE UNIQUE')
+            ]
+            for name, _ in indexes:
+                cursor.execute(
+                    f'DROP INDEX {self.connection.ops.quote_name(name)}'
+                )
+        self.dropped_indexes[table] = indexes
+
+    def restore_indexes(self):
+        with self.connection.cursor() as cursor:
+            for table, indexes in self.dropped_indexes.items():
+                for _, sql in indexes:
+                    cursor.execute(sql)
+        self.dropped_indexes = {}
+
+    def check_constraints(self, models):
+        """Проверить внешние ключи в таблицах моделей и их связей."""
+        tables = [
+            model._meta.db_table for model in models
+        ] + [
+            field.remote_field.through._meta.db_table
+            for model in models
+            for field in model._meta.many_to_many
+        ]
+        self.connection.check_constraints(table_names=tables)
+
+
+def refresh_derived_state(posts=True, comments=True):
+    """Досчитать после вставки в обход save() то, что делают сигналы.
+
+    is_live, счётчики комментариев и поисковый индекс пересчитываются
+    одним проходом по таблице, кеши страниц и лент сбрасываются целиком.
+    """
+    if posts:
+        now = timezone.now()
+        Post.objects.filter(is_live=False, pub_date__lte=now).update(
+            is_live=True
+        )
+        Post.objects.filter(is_live=True, pub_date__gt=now).update(
+            is_live=False
+        )
+        if search_supported():
+            rebuild_search_index()
+    if posts or comments:
+        recount_comment_counts(Post.objects.all())
+    invalidate_feed_counts()
+    remember_next_release()
+    invalidate_tags(
+        'feeds', 'feed', 'locations',
+        'sitemap:posts', 'sitemap:categories', 'sitemap:profiles',
+    )
@@ -3,6 +3,7 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import UserChangeForm
 
 from .models import Comment, Post
+from .uploads import BoundedImageField
 
 
 User = get_user_model()
@@ -13,6 +14,9 @@ class PostForm(forms.ModelForm):
     class Meta:
         model = Post
         exclude = ['author']
+        field_classes = {
+            'image': BoundedImageField,
+        }
         widgets = {
             'pub_date': forms.DateTimeInput(attrs={'type': 'datetime-local'}),
         }
@@ -0,0 +1,154 @@
+"""Уменьшенные копии изображений публикаций.
+
+Копии строятся в фоновом пуле потоков после коммита транзакции, а не
+в потоке запроса. Результат пишется в Post.image_variants: URL и размеры
+копий для карточки и страницы поста плюс srcset для WebP/AVIF, если
+Pillow умеет их сохранять.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from blog.models import Post
+from blog.page_cache import invalidate_tags
+
+
+logger = logging.getLogger(__name__)
+
+VARIANT_WIDTHS = {
+    'card': 640,
+    'detail': 1280,
+}
+VARIANT_DIR = 'variants'
+MODERN_FORMATS = [
+    ('AVIF', 'image/avif', 'avif'),
+    ('WEBP', 'image/webp', 'webp'),
+]
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'IMAGE_VARIANT_WORKERS', 2),
+            thread_name_prefix='image-variants',
+        )
+    return _executor
+
+
+def schedule_image_variants(post_id):
+    """Поставить построение копий в очередь после коммита транзакции.
+
+    При IMAGE_VARIANT_WORKERS = 0 фоновая обработка выключена, копии
+    строит команда generate_image_variants.
+    """
+    if getattr(settings, 'IMAGE_VARIANT_WORKERS', 2) <= 0:
+        return
+    transaction.on_commit(
+        lambda: get_executor().submit(_run_in_worker, post_id)
+    )
+
+
+def _run_in_worker(post_id):
+    close_old_connections()
+    try:
+        generate_image_variants(post_id)
+    except Exception:
+        logger.exception('Не удалось построить копии изображения %s', post_id)
+    finally:
+        close_old_connections()
+
+
+def _supported_formats():
+    Image.init()
+    return [fmt for fmt in MODERN_FORMATS if fmt[0] in Image.SAVE]
+
+
+def _encode(image, image_format):
+    buffer = BytesIO()
+    if image_format == 'JPEG':
+        image.convert('RGB').save(buffer, 'JPEG', quality=85,
+                                  optimize=True, progressive=True)
+    else:
+        image.save(buffer, image_format, quality=80)
+    return buffer.getvalue()
+
+
+def delete_image_variants(variants, storage):
+    for name in variants.get('files', []):
+        storage.delete(name)
+
+
+def generate_image_variants(post_id):
+    """Построить копии изображения поста и сохранить их описание."""
+    post = Post.objects.filter(pk=post_id).only('image', 'image_variants')
+    post = post.first()
+    if post is None or not post.image:
+        return None
+    storage = default_storage
+    with post.image.open('rb') as file:
+        original = ImageOps.exif_transpose(Image.open(file))
+        original.load()
+    has_alpha = original.mode in ('RGBA', 'LA') or (
+        original.mode == 'P' and 'transparency' in original.info
+    )
+    fallback_format, fallback_ext = (
+        ('PNG', 'png') if has_alpha else ('JPEG', 'jpg')
+    )
+    stem = PurePosixPath(post.image.name).stem
+    modern = _supported_formats()
+    files = []
+    srcsets = {fmt[1]: [] for fmt in modern}
+    fallback_srcset = []
+    variants = {}
+    for size, width in VARIANT_WIDTHS.items():
+        image = original.copy()
+        image.thumbnail((width, width * 4), Image.LANCZOS)
+        previous = next((
+            variant for variant in variants.values()
+            if variant['width'] == image.width
+        ), None)
+        if previous is not None:
+            # Оригинал меньше этой ширины — повторно не кодируем.
+            variants[size] = previous
+            continue
+        base = f'{VARIANT_DIR}/{post_id}/{stem}_{size}'
+        name = storage.save(f'{base}.{fallback_ext}',
+                            ContentFile(_encode(image, fallback_format)))
+        files.append(name)
+        url = storage.url(name)
+        variants[size] = {
+            'url': url, 'width': image.width, 'height': image.height,
+        }
+        fallback_srcset.append(f'{url} {image.width}w')
+        for image_format, mime, ext in modern:
+            name = storage.save(f'{base}.{ext}',
+                                ContentFile(_encode(image, image_format)))
+            files.append(name)
+            srcsets[mime].append(f'{storage.url(name)} {image.width}w')
+    variants['srcset'] = ', '.join(fallback_srcset)
+    variants['sources'] = [
+        {'type': mime, 'srcset': ', '.join(srcset)}
+        for mime, srcset in srcsets.items()
+    ]
+    variants['files'] = files
+    updated = Post.objects.filter(pk=post_id, image=post.image.name).update(
+        image_variants=variants, updated_at=timezone.now()
+    )
+    if not updated:
+        # Пока строились копии, изображение заменили или пост удалили.
+        delete_image_variants(variants, storage)
+        return None
+    delete_image_variants(post.image_variants, storage)
+    invalidate_tags(f'post:{post_id}')
+    return variants
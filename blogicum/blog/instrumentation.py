@@ -0,0 +1,142 @@
+import json
+import logging
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.template import base as template_base
+
+
+logger = logging.getLogger('blog.metrics')
+
+# Кеш для замеров производительности. Основной кеш общий с работающими
+# веб-процессами, и бенчмарк не должен ни чистить его, ни оставлять в
+# нём страницы и версии тегов от данных, которые потом откатит.
+BENCHMARK_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'blog-benchmark',
+    },
+}
+
+_current_metrics = ContextVar('blog_request_metrics', default=None)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def query_budget(max_queries):
+    """Объявить, сколько SQL-запросов может выполнить представление."""
+    def decorator(view):
+        view.query_budget = max_queries
+        return view
+    return decorator
+
+
+class RequestMetrics:
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.total_time = 0.0
+        self._template_depth = 0
+
+    def sql_wrapper(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - start
+            self.queries += 1
+
+    def server_timing(self):
+        return ', '.join((
+            f'db;dur={self.sql_time * 1000:.1f};desc="{self.queries} queries"',
+            f'tpl;dur={self.template_time * 1000:.1f}',
+            f'total;dur={self.total_time * 1000:.1f}',
+        ))
+
+
+def _install_template_timer():
+    """Считать время рендера шаблонов верхнего уровня в текущем запросе."""
+    original_render = template_base.Template.render
+    if getattr(original_render, 'is_timed', False):
+        return
+
+    def render(template, context):
+        metrics = _current_metrics.get()
+        if metrics is None:
+            return original_render(template, context)
+        metrics._template_depth += 1
+        start = time.perf_counter()
+        try:
+            return original_render(template, context)
+        finally:
+            metrics._template_depth -= 1
+            if not metrics._template_depth:
+                metrics.template_time += time.perf_counter() - start
+
+    render.is_timed = True
+    template_base.Template.render = render
+
+
+class RequestMetricsMiddleware:
+    """Замеряет запросы к БД, SQL, шаблоны и общее время на каждый запрос.
+
+    Итог уходит в заголовок Server-Timing и строкой JSON в логгер
+    `blog.metrics`. Если у представления объявлен query_budget и он
+    превышен, при QUERY_BUDGET_STRICT поднимается QueryBudgetExceeded.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        _install_template_timer()
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(metrics.sql_wrapper)
+                    )
+                response = self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+        metrics.total_time = time.perf_counter() - start
+
+        match = request.resolver_match
+        view_name = match.view_name if match else None
+        response['Server-Timing'] = metrics.server_timing()
+        logger.info(json.dumps({
+            'view': view_name,
+            'method': request.method,
+            'status': response.status_code,
+            'queries': metrics.queries,
+            'sql_ms': round(metrics.sql_time * 1000, 2),
+            'template_ms': round(metrics.template_time * 1000, 2),
+            'total_ms': round(metrics.total_time * 1000, 2),
+        }))
+        self.check_budget(request, view_name, metrics)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = getattr(view_func, 'query_budget', None)
+
+    def check_budget(self, request, view_name, metrics):
+        budget = getattr(request, 'query_budget', None)
+        if budget is None or metrics.queries <= budget:
+            return
+        message = (
+            f'{view_name} выполнил {metrics.queries} SQL-запросов '
+            f'при бюджете {budget}'
+        )
+        if getattr(settings, 'QUERY_BUDGET_STRICT', False):
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
@@ -0,0 +1,197 @@
+import json
+import logging
+import time
+from statistics import median, quantiles
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from blog.admin import PostAdmin
+from blog.instrumentation import BENCHMARK_CACHES
+from blog.models import Category, Comment, Location, Post
+from blog.search import rebuild_search_index
+from blog.utils import remember_next_release
+
+
+User = get_user_model()
+
+NOW_SQL = "strftime('%%Y-%%m-%%d %%H:%%M:%%f', 'now')"
+SEQUENCE_SQL = (
+    'WITH RECURSIVE seq(n) AS '
+    '(SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < %s) '
+)
+
+
+class Rollback(Exception):
+    pass
+
+
+def seed_authors(count):
+    """Создать count авторов bench-1 … bench-N; вернуть их id подряд."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'{SEQUENCE_SQL}INSERT INTO {User._meta.db_table} (password, '
+            'is_superuser, username, first_name, last_name, email, '
+            'is_staff, is_active, date_joined) '
+            "SELECT '!', 0, 'bench-' || n, '', '', '', 0, 1, "
+            f'{NOW_SQL} FROM seq',
+            [count],
+        )
+    return User.objects.get(username='bench-1').pk
+
+
+def seed_posts(count, first_author, authors, category, location):
+    """Вставить count постов одним INSERT … SELECT без ORM и сигналов."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'{SEQUENCE_SQL}INSERT INTO {Post._meta.db_table} (title, text, '
+            'pub_date, author_id, category_id, location_id, image, '
+            'image_variants, comment_count, is_live, is_published, '
+            'created_at, updated_at) '
+            "SELECT 'Публикация ' || n, 'Текст публикации номер ' || n, "
+            "strftime('%%Y-%%m-%%d %%H:%%M:%%f', 'now', "
+            "'-' || n || ' minutes'), %s + n %% %s, %s, "
+            "CASE WHEN n %% 3 = 0 THEN %s END, '', '{}', 0, 1, "
+            f'n %% 10 != 0, {NOW_SQL}, {NOW_SQL} FROM seq',
+            [count, first_author, authors, category.pk, location.pk],
+        )
+
+
+def seed_comments(count, first_author, authors, posts):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'{SEQUENCE_SQL}INSERT INTO {Comment._meta.db_table} '
+            '(text, post_id, author_id, created_at) '
+            "SELECT 'Комментарий ' || n, "
+            f'(SELECT MAX(id) FROM {Post._meta.db_table}) - n %% %s, '
+            f'%s + n %% %s, {NOW_SQL} FROM seq',
+            [count, posts, first_author, authors],
+        )
+
+
+class Command(BaseCommand):
+    help = (
+        'Наполняет базу синтетическими публикациями (по умолчанию '
+        'миллионом), замеряет страницы админки и откатывает изменения.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1_000_000)
+        parser.add_argument('--comments', type=int, default=200_000)
+        parser.add_argument('--authors', type=int, default=1000)
+        parser.add_argument('--iterations', type=int, default=10)
+        parser.add_argument(
+            '--target-ms', type=float, default=500,
+            help='Допустимое время p95 для каждой страницы с прогретым '
+                 'кешем числа строк.',
+        )
+        parser.add_argument(
+            '--json', dest='json_path',
+            help='Сохранить результаты в JSON-файл.',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Наполнение написано для SQLite.')
+        metrics_logger = logging.getLogger('blog.metrics')
+        level = metrics_logger.level
+        metrics_logger.setLevel(logging.WARNING)
+        try:
+            with override_settings(DEBUG=False, CACHES=BENCHMARK_CACHES), \
+                    transaction.atomic():
+                results = self.run(options)
+                raise Rollback
+        except Rollback:
+            pass
+        finally:
+            metrics_logger.setLevel(level)
+            # Middleware могло открыть посты внутри откаченной транзакции.
+            remember_next_release()
+
+        slow = []
+        for name, stats in results.items():
+            self.stdout.write(
+                f"{name:<24} cold {stats['cold_ms']:8.1f} ms  "
+                f"p50 {stats['p50_ms']:8.1f} ms  "
+                f"p95 {stats['p95_ms']:8.1f} ms  "
+                f"{stats['queries']} queries"
+            )
+            if stats['p95_ms'] > options['target_ms']:
+                slow.append(name)
+        if options['json_path']:
+            with open(options['json_path'], 'w', encoding='utf-8') as file:
+                json.dump(results, file, ensure_ascii=False, indent=2)
+        if slow:
+            raise CommandError(
+                f"Дольше {options['target_ms']} ms: {', '.join(slow)}"
+            )
+        self.stdout.write(self.style.SUCCESS('Все страницы уложились в цель.'))
+
+    def run(self, options):
+        admin_user = User.objects.create_superuser(
+            'bench-admin', 'bench@example.com', 'bench'
+        )
+        category = Category.objects.create(
+            title='Бенчмарк', slug='bench', description='')
+        location = Location.objects.create(name='Бенчмарк')
+        start = time.perf_counter()
+        first_author = seed_authors(options['authors'])
+        seed_posts(options['posts'], first_author, options['authors'],
+                   category, location)
+        if options['comments']:
+            seed_comments(options['comments'], first_author,
+                          options['authors'], options['posts'])
+        rebuild_search_index()
+        self.stdout.write(
+            f"Создано {options['posts']} публикаций и "
+            f"{options['comments']} комментариев от {options['authors']} "
+            f'авторов за {time.perf_counter() - start:.1f} s'
+        )
+        post = Post.objects.order_by('-pk').first()
+        changelist = reverse('admin:blog_post_changelist')
+        middle_page = options['posts'] // PostAdmin.list_per_page // 2
+        comments = reverse('admin:blog_comment_changelist')
+        pages = {
+            'posts': changelist,
+            'posts_middle_page': f'{changelist}?p={middle_page}',
+            'posts_published': f'{changelist}?is_published__exact=1',
+            'posts_by_author': f'{changelist}?author=bench-1',
+            'posts_search': f'{changelist}?q=номер+{options["posts"] // 2}',
+            'post_change': reverse('admin:blog_post_change', args=[post.pk]),
+            'author_autocomplete': (
+                f"{reverse('admin:autocomplete')}?app_label=blog"
+                '&model_name=post&field_name=author&term=bench'
+            ),
+            'comments': comments,
+            'comments_by_post': f'{comments}?q={post.pk}',
+        }
+        client = Client(HTTP_HOST='localhost')
+        client.force_login(admin_user)
+        results = {}
+        for name, url in pages.items():
+            timings = []
+            # Первый запрос считает COUNT и наполняет кеш — его время
+            # выводится отдельно и в перцентили не входит.
+            for _ in range(options['iterations'] + 1):
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    response = client.get(url)
+                    timings.append((time.perf_counter() - started) * 1000)
+                if response.status_code != 200:
+                    raise CommandError(
+                        f'{url} ответил {response.status_code}'
+                    )
+            cold, *timings = timings
+            results[name] = {
+                'url': url,
+                'cold_ms': cold,
+                'p50_ms': median(timings),
+                'p95_ms': (quantiles(timings, n=20)[-1]
+                           if len(timings) > 1 else timings[0]),
+                'queries': len(queries),
+            }
+        return results
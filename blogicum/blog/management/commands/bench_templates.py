@@ -0,0 +1,141 @@
+import json
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from statistics import mean
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.template import base as template_base
+from django.template.loader import render_to_string
+from django.test import RequestFactory, override_settings
+from django.utils import timezone
+
+from blog.forms import CommentForm
+from blog.instrumentation import BENCHMARK_CACHES
+from blog.models import Category, Comment, Location, Post
+from blog.utils import NUM_POSTS_TO_DISPLAY, CursorPage
+
+
+User = get_user_model()
+
+
+@contextmanager
+def template_timer():
+    """Собрать суммарное время рендера каждого шаблона (с вложенными)."""
+    timings = defaultdict(float)
+    calls = defaultdict(int)
+    original_render = template_base.Template._render
+
+    def timed_render(template, context):
+        start = time.perf_counter()
+        try:
+            return original_render(template, context)
+        finally:
+            timings[template.origin.template_name] += (
+                time.perf_counter() - start
+            )
+            calls[template.origin.template_name] += 1
+
+    template_base.Template._render = timed_render
+    try:
+        yield timings, calls
+    finally:
+        template_base.Template._render = original_render
+
+
+def build_posts(count, author):
+    now = timezone.now()
+    category = Category(pk=1, title='Категория', slug='category',
+                        description='', is_published=True)
+    location = Location(pk=1, name='Место', is_published=True)
+    return [
+        Post(pk=pk, title=f'Публикация {pk}', text='Текст публикации ' * 30,
+             pub_date=now, updated_at=now, author=author, category=category,
+             location=location, comment_count=pk, is_published=True)
+        for pk in range(1, count + 1)
+    ]
+
+
+def build_comments(count, post, author):
+    now = timezone.now()
+    return [
+        Comment(pk=pk, text='Комментарий ' * 10, post=post, author=author,
+                created_at=now)
+        for pk in range(1, count + 1)
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет время рендера шаблонов ленты из 10 карточек и страницы '
+        'поста с 500 комментариями.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--comments', type=int, default=500)
+        parser.add_argument(
+            '--json', dest='json_path',
+            help='Сохранить результаты в JSON-файл.',
+        )
+
+    def handle(self, *args, **options):
+        author = User(pk=1, username='author')
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        posts = build_posts(NUM_POSTS_TO_DISPLAY, author)
+        pages = {
+            'feed': ('blog/index.html', {
+                'page_obj': CursorPage(posts, True, True),
+            }),
+            'detail': ('blog/detail.html', {
+                'post': posts[0],
+                'form': CommentForm(),
+                'comments': build_comments(
+                    options['comments'], posts[0], author
+                ),
+            }),
+        }
+        with override_settings(CACHES=BENCHMARK_CACHES):
+            results = self.run(pages, request, options['iterations'])
+        for page, result in results.items():
+            self.stdout.write(
+                f"{page}: {result['total_ms']['mean']:.2f} ms "
+                f"(min {result['total_ms']['min']:.2f} ms)"
+            )
+            for name, stats in result['templates'].items():
+                self.stdout.write(
+                    f"  {name:<32} {stats['ms_per_page']:8.3f} ms "
+                    f"x{stats['renders_per_page']}"
+                )
+        if options['json_path']:
+            with open(options['json_path'], 'w', encoding='utf-8') as file:
+                json.dump(results, file, ensure_ascii=False, indent=2)
+
+    def run(self, pages, request, iterations):
+        results = {}
+        for page, (template_name, context) in pages.items():
+            totals = []
+            with template_timer() as (timings, calls):
+                for _ in range(iterations):
+                    cache.clear()
+                    start = time.perf_counter()
+                    render_to_string(template_name, context, request)
+                    totals.append(time.perf_counter() - start)
+            results[page] = {
+                'total_ms': {
+                    'mean': mean(totals) * 1000,
+                    'min': min(totals) * 1000,
+                },
+                'templates': {
+                    name: {
+                        'ms_per_page': timings[name] / iterations * 1000,
+                        'renders_per_page': calls[name] // iterations,
+                    }
+                    for name in sorted(timings, key=timings.get, reverse=True)
+                },
+            }
+        return results
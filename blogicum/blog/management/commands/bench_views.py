@@ -0,0 +1,191 @@
+import json
+import logging
+import time
+from statistics import median, quantiles
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, reverse
+from django.utils import timezone
+
+from blog import urls as blog_urls
+from blog.instrumentation import BENCHMARK_CACHES
+from blog.models import Comment
+from blog.sitemaps import SITEMAP_CHUNK_SIZE
+from blog.utils import get_published_posts, remember_next_release
+from pages import urls as pages_urls
+
+
+# Представления, которые без входа только перенаправляют на логин:
+# их меряют от имени автора поста или комментария.
+LOGIN_AS = {
+    'blog:create_post': 'post',
+    'blog:edit_post': 'post',
+    'blog:delete_post': 'post',
+    'blog:add_comment': 'post',
+    'blog:edit_profile': 'post',
+    'blog:edit_comment': 'comment',
+    'blog:delete_comment': 'comment',
+}
+
+
+class Rollback(Exception):
+    pass
+
+
+def iter_url_patterns(module):
+    """Пары (имя с пространством имён, имена аргументов) модуля urls."""
+    def walk(patterns):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                yield from walk(pattern.url_patterns)
+            elif pattern.name:
+                yield (f'{module.app_name}:{pattern.name}',
+                       list(pattern.pattern.converters))
+    yield from walk(module.urlpatterns)
+
+
+def percentile_stats(timings):
+    if len(timings) > 1:
+        cuts = quantiles(timings, n=100, method='inclusive')
+        p95, p99 = cuts[94], cuts[98]
+    else:
+        p95 = p99 = timings[0]
+    return {'p50_ms': median(timings), 'p95_ms': p95, 'p99_ms': p99}
+
+
+class Command(BaseCommand):
+    help = (
+        'Обходит все адреса blog/urls.py и pages/urls.py тестовым '
+        'клиентом и сообщает p50/p95/p99 и число SQL-запросов по каждому '
+        'представлению. Данные берутся из текущей базы — наполните её '
+        'командой generate_content.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument(
+            '--cold', action='store_true',
+            help='Очищать весь кеш перед каждым запросом.',
+        )
+        parser.add_argument(
+            '--json', dest='json_path',
+            help='Сохранить результаты в JSON-файл.',
+        )
+        parser.add_argument(
+            '--compare', metavar='PATH',
+            help='Сравнить p95 с прошлым запуском из JSON-файла.',
+        )
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations должен быть положительным.')
+        post = get_published_posts().order_by('-comment_count').first()
+        comment = Comment.objects.filter(post=post).order_by('pk').first()
+        if post is None or comment is None:
+            raise CommandError(
+                'Нужен опубликованный пост с комментарием; наполните '
+                'базу командой generate_content.'
+            )
+        metrics_logger = logging.getLogger('blog.metrics')
+        level = metrics_logger.level
+        metrics_logger.setLevel(logging.WARNING)
+        try:
+            # Свой кеш: общий нельзя чистить при --cold, и в нём не должно
+            # остаться страниц и дат публикаций от откаченных данных.
+            with override_settings(DEBUG=False, CACHES=BENCHMARK_CACHES), \
+                    transaction.atomic():
+                results = self.run(post, comment, options)
+                raise Rollback
+        except Rollback:
+            pass
+        finally:
+            metrics_logger.setLevel(level)
+            # Middleware могло открыть посты внутри откаченной транзакции.
+            remember_next_release()
+
+        previous = {}
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as file:
+                previous = json.load(file)['views']
+        for name, stats in results['views'].items():
+            line = (
+                f"{name:<26} {stats['status']} "
+                f"p50 {stats['p50_ms']:8.1f} ms  "
+                f"p95 {stats['p95_ms']:8.1f} ms  "
+                f"p99 {stats['p99_ms']:8.1f} ms  "
+                f"{stats['queries']} queries"
+            )
+            if name in previous:
+                before = previous[name]['p95_ms']
+                change = (stats['p95_ms'] - before) / before * 100
+                line += f'  p95 {change:+.0f}%'
+            self.stdout.write(line)
+        if options['json_path']:
+            with open(options['json_path'], 'w', encoding='utf-8') as file:
+                json.dump(results, file, ensure_ascii=False, indent=2)
+
+    def run(self, post, comment, options):
+        samples = {
+            'id': post.pk,
+            'post_id': post.pk,
+            'pk': post.pk,
+            'comment_id': comment.pk,
+            'username': post.author.get_username(),
+            'category_slug': post.category.slug,
+            'section': 'posts',
+            'number': post.pk // SITEMAP_CHUNK_SIZE,
+        }
+        query_strings = {'blog:search': {'q': post.title.split()[0]}}
+        headers = {'HTTP_HOST': 'localhost',
+                   'HTTP_ACCEPT_ENCODING': 'gzip, deflate, br'}
+        clients = {None: Client(**headers)}
+        for role, user in (('post', post.author), ('comment', comment.author)):
+            clients[role] = Client(**headers)
+            clients[role].force_login(user)
+
+        views = {}
+        for module in (blog_urls, pages_urls):
+            for name, arguments in iter_url_patterns(module):
+                missing = [arg for arg in arguments if arg not in samples]
+                if missing:
+                    self.stderr.write(f'{name}: нет примера для {missing}')
+                    continue
+                url = reverse(name, kwargs={
+                    arg: samples[arg] for arg in arguments
+                })
+                client = clients[LOGIN_AS.get(name)]
+                views[name] = self.measure(
+                    client, url, query_strings.get(name, {}), options
+                )
+        return {
+            'started_at': timezone.now().isoformat(),
+            'iterations': options['iterations'],
+            'cold': options['cold'],
+            'views': views,
+        }
+
+    def measure(self, client, url, data, options):
+        timings = []
+        # Первый запрос наполняет кеши; при --cold кеш чистится перед
+        # каждым, и первый запрос ничем не отличается от остальных.
+        for _ in range(options['iterations'] + 1):
+            if options['cold']:
+                cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = client.get(url, data)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+                timings.append((time.perf_counter() - started) * 1000)
+        cold, *timings = timings
+        return {
+            'url': url,
+            'status': response.status_code,
+            'cold_ms': cold,
+            **percentile_stats(timings),
+            'queries': len(queries),
+        }
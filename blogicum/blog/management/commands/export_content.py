@@ -0,0 +1,60 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.export import (
+    EXPORT_CHUNK_SIZE, ContentExporter, ExportStateError, finished_watermark,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает пользователей, категории, места, публикации и '
+        'комментарии в сжатые gzip файлы JSONL, читая таблицы пачками.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory', help='Каталог для файлов выгрузки.')
+        parser.add_argument(
+            '--chunk-size', type=int, default=EXPORT_CHUNK_SIZE,
+            help='Сколько строк читать одним запросом.',
+        )
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Продолжить прерванную выгрузку в этом каталоге.',
+        )
+        parser.add_argument(
+            '--since', metavar='PREVIOUS_DIRECTORY',
+            help='Инкрементальная выгрузка: только строки, созданные '
+                 'после законченной выгрузки из этого каталога.',
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size должен быть положительным.')
+        if options['resume'] and options['since']:
+            raise CommandError('--resume и --since несовместимы.')
+        exporter = ContentExporter(options['directory'],
+                                   chunk_size=options['chunk_size'])
+        started = time.perf_counter()
+        try:
+            if options['resume']:
+                state = exporter.resume()
+            else:
+                watermark = (finished_watermark(options['since'])
+                             if options['since'] else None)
+                state = exporter.start(watermark)
+            exporter.run(state)
+        except (OSError, ExportStateError) as error:
+            raise CommandError(f'Выгрузка прервана: {error}')
+        elapsed = time.perf_counter() - started
+
+        for label, stats in exporter.stats.items():
+            rate = stats['rows'] / stats['seconds'] if stats['seconds'] else 0
+            self.stdout.write(
+                f'{label:<24} {stats["rows"]:>10} строк  '
+                f'{stats["seconds"]:8.2f} s  {rate:>10.0f} строк/с'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Выгрузка в {options["directory"]} закончена за {elapsed:.1f} s.'
+        ))
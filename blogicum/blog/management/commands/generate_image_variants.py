@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from blog.images import generate_image_variants
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Строит уменьшенные копии фото у публикаций, где их ещё нет.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Перестроить копии у всех публикаций с фото.',
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='')
+        if not options['all']:
+            posts = posts.filter(image_variants={})
+        done = 0
+        for pk in posts.values_list('pk', flat=True).iterator():
+            if generate_image_variants(pk):
+                done += 1
+        self.stdout.write(self.style.SUCCESS(f'Обработано публикаций: {done}'))
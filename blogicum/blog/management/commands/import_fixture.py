@@ -0,0 +1,102 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.base import DeserializationError
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, connections
+
+from blog.fixture_import import (
+    IMPORT_BATCH_SIZE, FixtureFormatError, FixtureImporter,
+    iter_fixture_records, open_fixture, refresh_derived_state,
+)
+from blog.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Быстро загружает большую фикстуру формата dumpdata (можно .gz): '
+        'читает её потоком и вставляет объекты пачками без сигналов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('fixture', help='Путь к файлу .json или .json.gz')
+        parser.add_argument(
+            '--batch-size', type=int, default=IMPORT_BATCH_SIZE,
+            help='Сколько объектов вставлять в одной транзакции.',
+        )
+        parser.add_argument(
+            '--defer-indexes', action='store_true',
+            help='Удалить обычные индексы на время загрузки и построить '
+                 'их в конце (только SQLite).',
+        )
+        parser.add_argument(
+            '--skip-existing', action='store_true',
+            help='Пропускать объекты, чей pk уже есть в базе.',
+        )
+        parser.add_argument(
+            '-e', '--exclude', action='append', default=[],
+            help='Не загружать модель app_label.ModelName; можно повторять.',
+        )
+        parser.add_argument(
+            '-i', '--ignorenonexistent', action='store_true',
+            help='Пропускать поля, которых нет в моделях.',
+        )
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть положительным.')
+        try:
+            importer = FixtureImporter(
+                batch_size=options['batch_size'],
+                skip_existing=options['skip_existing'],
+                defer_indexes=options['defer_indexes'],
+                using=options['database'],
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        connection = connections[options['database']]
+        started = time.perf_counter()
+        try:
+            with open_fixture(options['fixture']) as stream, \
+                    connection.constraint_checks_disabled():
+                try:
+                    importer.load(
+                        iter_fixture_records(stream),
+                        ignorenonexistent=options['ignorenonexistent'],
+                        exclude=options['exclude'],
+                    )
+                finally:
+                    importer.finish()
+        except (OSError, FixtureFormatError, DeserializationError,
+                IntegrityError) as error:
+            # Зафиксированные пачки остаются в базе: досчитать и для них
+            # счётчики, индекс и кеши, чтобы сайт не расходился с данными.
+            self.refresh(importer)
+            raise CommandError(
+                f'Загрузка прервана: {error}. Фикстура загружена частично: '
+                f'в базе {self.total(importer)} строк из пачек до ошибки.'
+            )
+        self.refresh(importer)
+        elapsed = time.perf_counter() - started
+
+        for label, stats in importer.stats.items():
+            self.stdout.write(
+                f'{label:<24} {stats.rows:>10} строк  '
+                f'{stats.seconds:8.2f} s  {stats.rate:>10.0f} строк/с'
+            )
+        total = self.total(importer)
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено {total} строк за {elapsed:.1f} s '
+            f'({total / elapsed if elapsed else 0:.0f} строк/с).'
+        ))
+
+    def refresh(self, importer):
+        labels = set(importer.stats)
+        if labels:
+            refresh_derived_state(
+                posts=Post._meta.label in labels,
+                comments=Comment._meta.label in labels,
+            )
+
+    def total(self, importer):
+        return sum(stats.rows for stats in importer.stats.values())
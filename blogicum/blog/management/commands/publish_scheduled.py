@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.scheduling import release_due_posts
+from blog.utils import next_release_at
+
+
+class Command(BaseCommand):
+    help = (
+        'Публикует отложенные посты, дата публикации которых наступила. '
+        'С --loop работает как воркер и просыпается к следующей дате.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Не завершаться, а ждать следующих публикаций.',
+        )
+        parser.add_argument(
+            '--max-sleep', type=float, default=60,
+            help='Максимальная пауза между проверками в секундах.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            pks = release_due_posts()
+            if pks:
+                self.stdout.write(f'Опубликовано постов: {len(pks)}')
+            if not options['loop']:
+                return
+            next_at = next_release_at()
+            delay = options['max_sleep']
+            if next_at is not None:
+                until_next = (next_at - timezone.now()).total_seconds()
+                delay = min(delay, max(until_next, 0))
+            time.sleep(delay)
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.search import rebuild_search_index, search_supported
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает полнотекстовый индекс публикаций.'
+
+    def handle(self, *args, **options):
+        if not search_supported():
+            raise CommandError(
+                'Полнотекстовый поиск работает только на SQLite.'
+            )
+        indexed = rebuild_search_index()
+        self.stdout.write(
+            self.style.SUCCESS(f'Проиндексировано публикаций: {indexed}')
+        )
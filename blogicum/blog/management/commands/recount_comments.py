@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+from blog.utils import recount_comment_counts
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает сохранённое число комментариев у публикаций.'
+
+    def handle(self, *args, **options):
+        updated = recount_comment_counts(Post.objects.all())
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитано публикаций: {updated}')
+        )
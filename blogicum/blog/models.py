@@ -1,5 +1,8 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.utils import timezone
+
+from blog.storage import post_image_storage
 
 
 User = get_user_model()
@@ -94,7 +97,30 @@ class Post(PublishedModel):
         verbose_name='Категория',
     )
     image = models.ImageField(
-        'Фото', blank=True
+        'Фото', blank=True, storage=post_image_storage
+    )
+    image_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name='Уменьшенные копии фото',
+    )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев',
+    )
+    # Считается в save(). Запись в обход save() (bulk_create, update())
+    # должна выставить его сама и вызвать utils.remember_next_release(),
+    # иначе пост откроется только по истечении NEXT_RELEASE_TIMEOUT.
+    is_live = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='Дата публикации наступила',
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменено'
     )
 
     class Meta:
@@ -102,10 +128,38 @@ class Post(PublishedModel):
         verbose_name_plural = 'Публикации'
         ordering = ['-pub_date']
         default_related_name = 'posts'
+        indexes = [
+            models.Index(
+                fields=['pub_date'],
+                condition=models.Q(is_published=True, is_live=True),
+                name='post_published_feed_idx',
+            ),
+            models.Index(
+                fields=['category', 'pub_date'],
+                condition=models.Q(is_published=True, is_live=True),
+                name='post_category_feed_idx',
+            ),
+            models.Index(
+                fields=['author', 'pub_date'],
+                name='post_author_feed_idx',
+            ),
+            models.Index(
+                fields=['pub_date'],
+                condition=models.Q(is_live=False),
+                name='post_pending_release_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.title[:20]
 
+    def save(self, *args, **kwargs):
+        self.is_live = self.pub_date <= timezone.now()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'pub_date' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'is_live'}
+        super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     text = models.TextField('Комментарий')
@@ -119,6 +173,12 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ('created_at',)
+        indexes = [
+            models.Index(
+                fields=['post', 'created_at'],
+                name='comment_post_created_idx',
+            ),
+        ]
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
 
@@ -0,0 +1,120 @@
+"""Массовые действия модерации: одна инструкция UPDATE/DELETE на пачку.
+
+save() и delete() у объектов не вызываются, поэтому поштучные сигналы
+не срабатывают. Вместо них после коммита каждой пачки отправляется один
+сигнал bulk_changed, и его обработчики сбрасывают кеши и счётчики разом.
+"""
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from blog.images import delete_image_variants
+from blog.models import Category, Comment, Location, Post
+from blog.search import unindex_posts
+from blog.signals import bulk_changed
+from blog.utils import recount_comment_counts
+
+
+BULK_BATCH_SIZE = 1000
+
+# Поля, чьи значения нужны обработчикам bulk_changed для сброса кешей.
+RELATED_FIELDS = {
+    Post: ('category_id', 'author_id'),
+    Comment: ('post_id',),
+}
+
+
+def iter_pk_batches(queryset, batch_size=BULK_BATCH_SIZE):
+    """Отдавать id объектов пачками по возрастанию, без OFFSET."""
+    pks = queryset.prefetch_related(None).order_by('pk').values_list(
+        'pk', flat=True
+    )
+    last = None
+    while True:
+        page = pks if last is None else pks.filter(pk__gt=last)
+        batch = list(page[:batch_size])
+        if not batch:
+            return
+        yield batch
+        last = batch[-1]
+
+
+def _related_ids(model, pks):
+    fields = RELATED_FIELDS.get(model, ())
+    if not fields:
+        return {}
+    rows = model.objects.filter(pk__in=pks).values_list(*fields).distinct()
+    related = {field: set() for field in fields}
+    for row in rows:
+        for field, value in zip(fields, row):
+            if value is not None:
+                related[field].add(value)
+    return related
+
+
+def _run_batches(queryset, action, apply, batch_size):
+    model = queryset.model
+    changed = 0
+    for pks in iter_pk_batches(queryset, batch_size):
+        with transaction.atomic():
+            related = _related_ids(model, pks)
+            changed += apply(model, pks, related)
+        bulk_changed.send(sender=model, pks=pks, action=action,
+                          related=related)
+    return changed
+
+
+def set_published(queryset, is_published, batch_size=BULK_BATCH_SIZE):
+    """Опубликовать или снять с публикации; вернуть число изменённых."""
+    def apply(model, pks, related):
+        fields = {'is_published': is_published}
+        if model is Post:
+            fields['updated_at'] = timezone.now()
+        return model.objects.filter(pk__in=pks).update(**fields)
+
+    return _run_batches(
+        queryset.exclude(is_published=is_published), 'update', apply,
+        batch_size,
+    )
+
+
+def _delete_posts(pks):
+    variants = [
+        value for value in Post.objects.filter(pk__in=pks).values_list(
+            'image_variants', flat=True
+        ) if value
+    ]
+
+    def delete_files():
+        for value in variants:
+            delete_image_variants(value, default_storage)
+
+    Comment.objects.filter(post_id__in=pks)._raw_delete(Comment.objects.db)
+    unindex_posts(pks)
+    transaction.on_commit(delete_files)
+
+
+def delete_objects(queryset, batch_size=BULK_BATCH_SIZE):
+    """Удалить объекты пачками вместе с зависимыми; вернуть число удалённых.
+
+    Связи разбираются так же, как on_delete у моделей: комментарии
+    удаляются с постами, а посты удалённых категорий и мест остаются
+    без категории или места.
+    """
+    def apply(model, pks, related):
+        if model is Post:
+            _delete_posts(pks)
+        elif model in (Category, Location):
+            field = model._meta.model_name
+            Post.objects.filter(**{f'{field}__in': pks}).update(
+                **{field: None, 'updated_at': timezone.now()}
+            )
+        objects = model.objects.filter(pk__in=pks)
+        deleted = objects._raw_delete(objects.db)
+        if model is Comment:
+            recount_comment_counts(
+                Post.objects.filter(pk__in=related['post_id'])
+            )
+        return deleted
+
+    return _run_batches(queryset, 'delete', apply, batch_size)
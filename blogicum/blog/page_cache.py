@@ -0,0 +1,168 @@
+"""Кеш целых страниц для анонимных GET-запросов.
+
+Каждая закешированная страница помнит теги, от которых зависит
+(`post:1`, `category:2`, `feed` и т.п.), и их версии на момент чтения
+данных.
+Сигналы моделей меняют версии тегов, и страница перестаёт считаться
+актуальной без перебора ключей кеша.
+"""
+from functools import wraps
+from hashlib import md5
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+
+PAGE_CACHE_TIMEOUT = 300
+PAGE_KEY_PREFIX = 'blog:page:'
+TAG_KEY_PREFIX = 'blog:page_tag:'
+HITS_KEY = 'blog:page_cache:hits'
+MISSES_KEY = 'blog:page_cache:misses'
+
+
+def post_tags(posts):
+    """Теги объектов, которые выводятся в карточках публикаций."""
+    tags = set()
+    for post in posts:
+        tags.add(f'post:{post.pk}')
+        tags.add(f'user:{post.author_id}')
+        if post.category_id:
+            tags.add(f'category:{post.category_id}')
+        if post.location_id:
+            tags.add(f'location:{post.location_id}')
+    return tags
+
+
+def tag_page(request, *tags):
+    """Отметить, от каких тегов зависит страница текущего запроса.
+
+    Версии тегов читаются сразу, и для каждого тега запоминается первая
+    из прочитанных: если тег сбросят, пока представление читает данные и
+    рендерит шаблон, страница сохранится уже устаревшей. Поэтому теги,
+    известные заранее, стоит отмечать до запросов к базе. Вне кеширующего
+    декоратора вызов ничего не делает.
+    """
+    if not hasattr(request, 'page_cache_tags'):
+        return
+    names = set()
+    for tag in tags:
+        if isinstance(tag, str):
+            names.add(tag)
+        else:
+            names.update(tag)
+    names.difference_update(request.page_cache_tags)
+    if names:
+        request.page_cache_tags.update(get_tag_versions(names))
+
+
+def get_tag_versions(tags):
+    keys = {f'{TAG_KEY_PREFIX}{tag}': tag for tag in tags}
+    versions = {
+        keys[key]: version
+        for key, version in cache.get_many(keys).items()
+    }
+    missing = [key for key, tag in keys.items() if tag not in versions]
+    if missing:
+        # add, а не set: если другой процесс успел завести версию или
+        # сбросить тег, его значение не затирается, а перечитывается.
+        for key in missing:
+            cache.add(key, uuid4().hex, None)
+        added = cache.get_many(missing)
+        for key in missing:
+            # Ключ мог тут же вытеснить кеш: такая версия не совпадёт ни
+            # с одной сохранённой, и страница будет считаться устаревшей.
+            versions[keys[key]] = added.get(key) or uuid4().hex
+    return versions
+
+
+def invalidate_tags(*tags):
+    cache.set_many(
+        {f'{TAG_KEY_PREFIX}{tag}': uuid4().hex for tag in tags}, None
+    )
+
+
+def _count(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, None)
+        cache.incr(key)
+
+
+def page_cache_stats():
+    return {
+        'hits': cache.get(HITS_KEY, 0),
+        'misses': cache.get(MISSES_KEY, 0),
+    }
+
+
+def reset_page_cache_stats():
+    cache.delete_many([HITS_KEY, MISSES_KEY])
+
+
+def _cached_page(view, anonymous_only):
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method != 'GET' or (
+                anonymous_only and request.user.is_authenticated):
+            return view(request, *args, **kwargs)
+        url = request.get_full_path()
+        key = PAGE_KEY_PREFIX + md5(url.encode()).hexdigest()
+        entry = cache.get(key)
+        if (entry is not None
+                and get_tag_versions(entry['tags']) == entry['tags']):
+            _count(HITS_KEY)
+            response = HttpResponse(
+                entry['content'], content_type=entry['content_type']
+            )
+            if entry['last_modified'] is not None:
+                response['Last-Modified'] = http_date(entry['last_modified'])
+            response['X-Page-Cache'] = 'HIT'
+            return _conditional(request, response, entry)
+        _count(MISSES_KEY)
+        request.page_cache_tags = {}
+        response = view(request, *args, **kwargs)
+        response['X-Page-Cache'] = 'MISS'
+        tags = request.page_cache_tags
+        if response.status_code != 200 or not tags:
+            return response
+        entry = {
+            'content': response.content,
+            'content_type': response['Content-Type'],
+            'etag': quote_etag(md5(response.content).hexdigest()),
+            'last_modified': parse_http_date_safe(
+                response.get('Last-Modified')
+            ),
+            'tags': tags,
+        }
+        cache.set(key, entry, PAGE_CACHE_TIMEOUT)
+        return _conditional(request, response, entry)
+    return wrapper
+
+
+def _conditional(request, response, entry):
+    """Проставить валидаторы и ответить 304, если у клиента та же версия."""
+    response['ETag'] = entry['etag']
+    conditional = get_conditional_response(
+        request, etag=entry['etag'], last_modified=entry['last_modified'],
+        response=response,
+    )
+    if conditional is not response:
+        conditional['X-Page-Cache'] = response['X-Page-Cache']
+    return conditional
+
+
+def cache_anonymous_page(view):
+    """Отдавать анонимам закешированную страницу, пока её теги актуальны.
+
+    Клиент с актуальным ETag или If-Modified-Since получает 304.
+    """
+    return _cached_page(view, anonymous_only=True)
+
+
+def cache_public_page(view):
+    """То же для страниц, которые не зависят от пользователя, — всем."""
+    return _cached_page(view, anonymous_only=False)
@@ -0,0 +1,65 @@
+"""Отложенные публикации.
+
+Пост с будущей датой сохраняется с is_live=False, и открывает его
+`release_due_posts`. Обычно её вызывает воркер
+`manage.py publish_scheduled --loop`; если он не запущен, то же делает
+`ScheduledReleaseMiddleware` на первом запросе после наступления даты.
+Время ближайшей публикации сигналы записывают в общий кеш при каждом
+изменении постов, так что в обычном запросе проверка стоит одного
+чтения из кеша. Запись живёт NEXT_RELEASE_TIMEOUT секунд: посты,
+записанные в обход save() без вызова remember_next_release(), откроются
+с такой задержкой.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from blog.models import Post
+from blog.signals import posts_released
+from blog.utils import NEXT_RELEASE_KEY, remember_next_release
+
+
+def release_due_posts(now=None):
+    """Открыть посты, чья дата публикации наступила; вернуть их id.
+
+    Заодно скрываются посты с is_live=True и датой в будущем: такие
+    оставляет запись в обход save(), например bulk_create или update().
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        due = Post.objects.select_for_update().filter(
+            is_live=False, pub_date__lte=now
+        )
+        pks = list(due.values_list('pk', flat=True))
+        if pks:
+            Post.objects.filter(pk__in=pks).update(is_live=True)
+        early = Post.objects.select_for_update().filter(
+            is_live=True, pub_date__gt=now
+        )
+        hidden = list(early.values_list('pk', flat=True))
+        if hidden:
+            Post.objects.filter(pk__in=hidden).update(is_live=False)
+    if pks or hidden:
+        posts_released.send(sender=Post, pks=pks + hidden)
+    return pks
+
+
+def release_is_due(now=None):
+    """Наступила ли дата ближайшей отложенной публикации."""
+    next_at = cache.get(NEXT_RELEASE_KEY)
+    if next_at is None:
+        next_at = remember_next_release()
+    return next_at <= (now or timezone.now()).timestamp()
+
+
+class ScheduledReleaseMiddleware:
+    """Открывать наступившие публикации, даже если воркер не запущен."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if release_is_due() and not release_due_posts():
+            # Посты уже открыл другой процесс: перечитать ближайшую дату.
+            remember_next_release()
+        return self.get_response(request)
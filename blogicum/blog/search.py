@@ -0,0 +1,162 @@
+"""Полнотекстовый поиск по публикациям на SQLite FTS5.
+
+Таблица blog_post_search хранит копию заголовка и текста поста под
+rowid = id поста и обновляется сигналами; после массовых изменений её
+пересобирает команда rebuild_search_index. Видимость проверяется теми же
+условиями, что и в ленте, а результаты упорядочены по bm25 (чем меньше,
+тем лучше) и листаются курсором (ранг, id) без OFFSET.
+
+Токенизатор unicode61 не считает «ё» буквой «е» с диакритикой, поэтому
+и индекс, и запрос приводят «ё» к «е» сами.
+"""
+import binascii
+import re
+from math import isfinite
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.db import connections, router
+
+from blog.models import Post
+from blog.utils import (
+    NUM_POSTS_TO_DISPLAY, CursorPage, get_published_posts, parse_pk,
+)
+
+
+SEARCH_TABLE = 'blog_post_search'
+TITLE_WEIGHT = 10.0
+TEXT_WEIGHT = 1.0
+MAX_QUERY_TERMS = 8
+TERM_RE = re.compile(r'\w+')
+
+RANK_SQL = f'bm25({SEARCH_TABLE}, %s, %s)'
+RANK_PARAMS = (TITLE_WEIGHT, TEXT_WEIGHT)
+
+
+def fold_text(text):
+    return text.replace('ё', 'е').replace('Ё', 'Е')
+
+
+def _fold_sql(column):
+    return f"replace(replace({column}, 'ё', 'е'), 'Ё', 'Е')"
+
+
+def _connection():
+    return connections[router.db_for_write(Post)]
+
+
+def search_supported():
+    return _connection().vendor == 'sqlite'
+
+
+def index_post(post):
+    if not search_supported():
+        return
+    with _connection().cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [post.pk]
+        )
+        cursor.execute(
+            f'INSERT INTO {SEARCH_TABLE}(rowid, title, text) '
+            'VALUES (%s, %s, %s)',
+            [post.pk, fold_text(post.title), fold_text(post.text)],
+        )
+
+
+def unindex_posts(post_ids):
+    if not search_supported() or not post_ids:
+        return
+    placeholders = ', '.join(['%s'] * len(post_ids))
+    with _connection().cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({placeholders})',
+            list(post_ids),
+        )
+
+
+def rebuild_search_index():
+    """Заново заполнить индекс из таблицы постов и сжать его сегменты."""
+    with _connection().cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {SEARCH_TABLE}(rowid, title, text) '
+            f"SELECT id, {_fold_sql('title')}, {_fold_sql('text')} "
+            f'FROM {Post._meta.db_table}'
+        )
+        indexed = cursor.rowcount
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('optimize')"
+        )
+    return indexed
+
+
+def build_match_query(query):
+    """Превратить ввод пользователя в запрос FTS5: все слова, в кавычках.
+
+    Кавычки не дают пользователю случайно написать синтаксис FTS5
+    (NEAR, OR, *), а None означает, что искать нечего.
+    """
+    terms = TERM_RE.findall(fold_text(query))[:MAX_QUERY_TERMS]
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"' for term in terms)
+
+
+def encode_rank_cursor(post):
+    raw = f'{post.rank!r}|{post.pk}'
+    return urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_rank_cursor(token):
+    """Вернуть пару (ранг, id) из токена или None, если он испорчен."""
+    try:
+        raw = urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode()
+        rank, pk = raw.split('|')
+        rank = float(rank)
+        if not isfinite(rank):
+            raise ValueError(f'ранг вне диапазона: {rank}')
+        return rank, parse_pk(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+class SearchPage(CursorPage):
+    """Страница результатов поиска; листается только вперёд."""
+
+    @property
+    def next_cursor(self):
+        if self._has_next and self.object_list:
+            return encode_rank_cursor(self.object_list[-1])
+        return None
+
+    @property
+    def previous_cursor(self):
+        return None
+
+
+def search_posts(query, after=None, per_page=NUM_POSTS_TO_DISPLAY):
+    """Опубликованные посты, подходящие под запрос, лучшие первыми."""
+    match = build_match_query(query)
+    if match is None or not search_supported():
+        return SearchPage([], False, False)
+    posts = get_published_posts().extra(
+        select={'rank': RANK_SQL},
+        select_params=RANK_PARAMS,
+        tables=[SEARCH_TABLE],
+        where=[
+            f'{SEARCH_TABLE} MATCH %s',
+            f'{SEARCH_TABLE}.rowid = {Post._meta.db_table}.id',
+        ],
+        params=[match],
+    )
+    if after is not None:
+        rank, pk = after
+        posts = posts.extra(
+            where=[
+                f'({RANK_SQL} > %s OR ({RANK_SQL} = %s '
+                f'AND {Post._meta.db_table}.id > %s))'
+            ],
+            params=[*RANK_PARAMS, rank, *RANK_PARAMS, rank, pk],
+        )
+    rows = list(posts.order_by('rank', 'pk')[:per_page + 1])
+    return SearchPage(rows[:per_page], len(rows) > per_page,
+                      after is not None)
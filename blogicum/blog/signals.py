@@ -0,0 +1,249 @@
+from contextvars import ContextVar
+
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.db.models import F
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save,
+)
+from django.dispatch import Signal, receiver
+
+from blog.images import delete_image_variants, schedule_image_variants
+from blog.models import Category, Comment, Location, Post
+from blog.page_cache import invalidate_tags
+from blog.search import index_post, unindex_posts
+from blog.sitemaps import chunk_tags
+from blog.utils import (
+    invalidate_feed_counts, invalidate_model_counts, remember_next_release,
+)
+
+
+User = get_user_model()
+
+# Отправляется планировщиком, когда у отложенных публикаций наступила
+# дата публикации; pks — id постов, чья видимость по дате изменилась
+# (открытых, а также скрытых из-за даты в будущем).
+posts_released = Signal()
+
+# Отправляется массовыми действиями модерации после каждой пачки,
+# изменённой одним UPDATE/DELETE в обход save() и delete(): pks — id
+# объектов пачки, action — 'update' или 'delete', related — id связанных
+# объектов по именам полей, например {'category_id': {1, 2}}.
+bulk_changed = Signal()
+
+# Чьи списки в админке меняются, когда массово меняют объекты модели.
+ADMIN_COUNTS_AFFECTED = {
+    Post: (Post, Comment),
+    Comment: (Comment,),
+}
+
+
+# id постов, которые удаляются сейчас. Их комментарии удаляются каскадом
+# по одному, и обработчики комментариев для них ничего не делают: пост
+# всё равно исчезнет, а кеши сбросят обработчики самого поста.
+_deleting_posts = ContextVar('blog_deleting_posts', default=frozenset())
+
+
+@receiver(pre_delete, sender=Post)
+def mark_post_deleting(sender, instance, **kwargs):
+    _deleting_posts.set(_deleting_posts.get() | {instance.pk})
+
+
+@receiver(post_delete, sender=Post)
+def unmark_post_deleting(sender, instance, **kwargs):
+    _deleting_posts.set(_deleting_posts.get() - {instance.pk})
+
+
+def _post_is_deleting(comment):
+    return comment.post_id in _deleting_posts.get()
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    if _post_is_deleting(instance):
+        return
+    Post.objects.filter(
+        pk=instance.post_id, comment_count__gt=0
+    ).update(comment_count=F('comment_count') - 1)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(posts_released)
+def reset_feed_counts(sender, **kwargs):
+    invalidate_feed_counts()
+
+
+# Списки админки считаются по поколению своей модели: комментарии
+# зависят и от постов, с которыми удаляются, а фильтры списка постов —
+# от категорий, мест и авторов.
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def reset_comment_admin_counts(sender, instance, **kwargs):
+    if not _post_is_deleting(instance):
+        invalidate_model_counts(Comment)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(posts_released)
+def reset_post_admin_counts(sender, **kwargs):
+    invalidate_model_counts(Post, Comment)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+@receiver(post_delete, sender=User)
+def reset_filtered_admin_counts(sender, **kwargs):
+    invalidate_model_counts(Post)
+
+
+@receiver(bulk_changed)
+def reset_bulk_admin_counts(sender, **kwargs):
+    invalidate_model_counts(*ADMIN_COUNTS_AFFECTED.get(sender, (Post,)))
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(posts_released)
+def update_next_release(sender, **kwargs):
+    remember_next_release()
+
+
+@receiver(pre_save, sender=Post)
+def remember_previous_post(sender, instance, raw=False, **kwargs):
+    instance._previous_state = None
+    if instance.pk and not raw:
+        instance._previous_state = Post.objects.filter(
+            pk=instance.pk
+        ).values_list('category_id', 'author_id', 'image').first()
+
+
+@receiver(post_save, sender=Post)
+def refresh_image_variants(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous_state', None)
+    previous_image = previous[2] if previous else ''
+    if instance.image and instance.image.name != previous_image:
+        schedule_image_variants(instance.pk)
+    elif not instance.image and instance.image_variants:
+        delete_image_variants(instance.image_variants, default_storage)
+        instance.image_variants = {}
+        Post.objects.filter(pk=instance.pk).update(image_variants={})
+
+
+@receiver(post_delete, sender=Post)
+def delete_post_image_variants(sender, instance, **kwargs):
+    delete_image_variants(instance.image_variants, default_storage)
+
+
+@receiver(post_save, sender=Post)
+def update_search_index(sender, instance, raw=False, update_fields=None,
+                        **kwargs):
+    if update_fields is not None and not {'title', 'text'} & update_fields:
+        return
+    index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def remove_from_search_index(sender, instance, **kwargs):
+    unindex_posts([instance.pk])
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_pages(sender, instance, **kwargs):
+    feeds = {(instance.category_id, instance.author_id)}
+    previous = getattr(instance, '_previous_state', None)
+    if previous:
+        feeds.add(previous[:2])
+    tags = {f'post:{instance.pk}', 'feed'}
+    for category_id, author_id in feeds:
+        tags.add(f'category-feed:{category_id}')
+        tags.add(f'user-feed:{author_id}')
+    tags |= chunk_tags('posts', [instance.pk])
+    tags |= chunk_tags('profiles', [author_id for _, author_id in feeds])
+    invalidate_tags(*tags)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_pages(sender, instance, **kwargs):
+    if not _post_is_deleting(instance):
+        invalidate_tags(f'post:{instance.post_id}')
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_pages(sender, instance, **kwargs):
+    invalidate_tags(
+        'feeds', f'category:{instance.pk}', f'category-feed:{instance.pk}',
+        'sitemap:posts', 'sitemap:profiles',
+        *chunk_tags('categories', [instance.pk]),
+    )
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_location_pages(sender, instance, **kwargs):
+    invalidate_tags('locations', f'location:{instance.pk}')
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_pages(sender, instance, **kwargs):
+    invalidate_tags(f'user:{instance.pk}',
+                    *chunk_tags('profiles', [instance.pk]))
+
+
+@receiver(posts_released)
+def invalidate_released_pages(sender, pks, **kwargs):
+    invalidate_tags('feeds', *(f'post:{pk}' for pk in pks),
+                    *chunk_tags('posts', pks), 'sitemap:profiles')
+
+
+@receiver(bulk_changed, sender=Post)
+def invalidate_bulk_posts(sender, pks, related, **kwargs):
+    invalidate_feed_counts()
+    invalidate_tags(
+        'feeds', 'feed',
+        *(f'post:{pk}' for pk in pks),
+        *(f'category-feed:{pk}' for pk in related.get('category_id', ())),
+        *(f'user-feed:{pk}' for pk in related.get('author_id', ())),
+        *chunk_tags('posts', pks),
+        *chunk_tags('profiles', related.get('author_id', ())),
+    )
+
+
+@receiver(bulk_changed, sender=Category)
+def invalidate_bulk_categories(sender, pks, **kwargs):
+    invalidate_feed_counts()
+    invalidate_tags(
+        'feeds', 'sitemap:posts', 'sitemap:profiles',
+        *chunk_tags('categories', pks),
+        *(f'category:{pk}' for pk in pks),
+        *(f'category-feed:{pk}' for pk in pks),
+    )
+
+
+@receiver(bulk_changed, sender=Location)
+def invalidate_bulk_locations(sender, pks, **kwargs):
+    invalidate_tags('locations', *(f'location:{pk}' for pk in pks))
+
+
+@receiver(bulk_changed, sender=Comment)
+def invalidate_bulk_comments(sender, related, **kwargs):
+    invalidate_tags(*(f'post:{pk}' for pk in related.get('post_id', ())))
@@ -0,0 +1,206 @@
+"""Карта сайта: индекс и дочерние карты по диапазонам id.
+
+Каждая дочерняя карта покрывает SITEMAP_CHUNK_SIZE подряд идущих id
+(не больше 50 000 адресов — лимит протокола), поэтому изменение объекта
+затрагивает ровно одну карту, и пересобирается только она. Строки
+читаются через iterator(chunk_size=…), XML сразу сжимается gzip, и в кеш
+кладётся уже сжатый результат: память зависит от размера карты, а не от
+размера таблицы.
+"""
+import zlib
+from hashlib import md5
+from urllib.parse import quote
+from xml.sax.saxutils import escape
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Exists, Max, OuterRef
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.http import RFC3986_SUBDELIMS
+
+from blog.models import Category, Post
+from blog.page_cache import get_tag_versions
+from blog.storage import accepted_encodings
+from blog.utils import get_published_posts
+
+
+User = get_user_model()
+
+SITEMAP_CHUNK_SIZE = 50_000
+ITERATOR_CHUNK_SIZE = 2_000
+SITEMAP_CACHE_TIMEOUT = 24 * 60 * 60
+SITEMAP_KEY_PREFIX = 'blog:sitemap:'
+XMLNS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+KEY_MARKER = '__sitemap_key__'
+
+
+def chunk_tags(section, pks):
+    """Теги дочерних карт раздела, в которые попадают объекты pks."""
+    return {f'sitemap:{section}:{pk // SITEMAP_CHUNK_SIZE}' for pk in pks}
+
+
+class SitemapSection:
+    """Раздел карты сайта: какие объекты и по какому адресу.
+
+    queryset() возвращает values_list из (pk, ключ для URL) и, если
+    у объектов есть дата изменения, третьим полем lastmod.
+    """
+
+    name = None
+    model = None
+    url_name = None
+    changefreq = None
+
+    def queryset(self):
+        raise NotImplementedError
+
+    def chunk_count(self):
+        max_pk = self.model.objects.aggregate(max_pk=Max('pk'))['max_pk']
+        return 0 if max_pk is None else max_pk // SITEMAP_CHUNK_SIZE + 1
+
+    def chunk_rows(self, number):
+        start = number * SITEMAP_CHUNK_SIZE
+        return self.queryset().filter(
+            pk__gte=start, pk__lt=start + SITEMAP_CHUNK_SIZE
+        ).order_by('pk').iterator(chunk_size=ITERATOR_CHUNK_SIZE)
+
+    def tags(self, number):
+        return {f'sitemap:{self.name}', f'sitemap:{self.name}:{number}'}
+
+    def url_parts(self):
+        # reverse() на каждую строку стоит десятки микросекунд, поэтому
+        # шаблон адреса строится один раз, а ключ подставляется в него.
+        return reverse(self.url_name, args=[KEY_MARKER]).split(KEY_MARKER)
+
+
+class PostSection(SitemapSection):
+    name = 'posts'
+    model = Post
+    url_name = 'blog:post_detail'
+    changefreq = 'weekly'
+
+    def queryset(self):
+        return get_published_posts().values_list('pk', 'pk', 'updated_at')
+
+    def url_parts(self):
+        return reverse(self.url_name, args=[0]).rsplit('0', 1)
+
+
+class CategorySection(SitemapSection):
+    name = 'categories'
+    model = Category
+    url_name = 'blog:category_posts'
+    changefreq = 'daily'
+
+    def queryset(self):
+        return Category.objects.filter(is_published=True).values_list(
+            'pk', 'slug'
+        )
+
+
+class ProfileSection(SitemapSection):
+    name = 'profiles'
+    model = User
+    url_name = 'blog:profile'
+    changefreq = 'weekly'
+
+    def queryset(self):
+        return User.objects.filter(Exists(
+            get_published_posts().filter(author=OuterRef('pk'))
+        )).values_list('pk', 'username')
+
+
+SECTIONS = {
+    section.name: section
+    for section in (PostSection(), CategorySection(), ProfileSection())
+}
+
+
+def _base_url(request):
+    return f'{request.scheme}://{request.get_host()}'
+
+
+def render_chunk(section, number, base_url):
+    """Собрать дочернюю карту, сжимая XML по мере чтения строк."""
+    compressor = zlib.compressobj(9, zlib.DEFLATED, GZIP_WBITS)
+    prefix, suffix = section.url_parts()
+    prefix = base_url + prefix
+    changefreq = (
+        f'<changefreq>{section.changefreq}</changefreq>'
+        if section.changefreq else ''
+    )
+    parts = [compressor.compress(
+        f'<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<urlset xmlns="{XMLNS}">\n'.encode()
+    )]
+    for _, key, *lastmod in section.chunk_rows(number):
+        loc = escape(
+            prefix + quote(str(key), safe=RFC3986_SUBDELIMS + ':@~') + suffix
+        )
+        entry = f'<url><loc>{loc}</loc>'
+        if lastmod:
+            entry += f'<lastmod>{lastmod[0].isoformat()}</lastmod>'
+        parts.append(compressor.compress(
+            f'{entry}{changefreq}</url>\n'.encode()
+        ))
+    parts.append(compressor.compress(b'</urlset>\n'))
+    parts.append(compressor.flush())
+    return b''.join(parts)
+
+
+def _gunzip(content, size=64 * 1024):
+    decompressor = zlib.decompressobj(GZIP_WBITS)
+    for start in range(0, len(content), size):
+        yield decompressor.decompress(content[start:start + size])
+    yield decompressor.flush()
+
+
+def gzip_xml_response(request, content):
+    """Отдать сжатый XML как есть или распаковать потоком для клиента."""
+    accepted = accepted_encodings(request.headers.get('Accept-Encoding', ''))
+    if 'gzip' in accepted or '*' in accepted:
+        response = HttpResponse(content, content_type='application/xml')
+        response['Content-Encoding'] = 'gzip'
+    else:
+        response = StreamingHttpResponse(
+            _gunzip(content), content_type='application/xml'
+        )
+    response['Vary'] = 'Accept-Encoding'
+    return response
+
+
+def sitemap_index(request):
+    base_url = _base_url(request)
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        f'<sitemapindex xmlns="{XMLNS}">',
+    ]
+    for name, section in SECTIONS.items():
+        for number in range(section.chunk_count()):
+            loc = base_url + reverse('blog:sitemap_chunk',
+                                     args=[name, number])
+            lines.append(f'<sitemap><loc>{escape(loc)}</loc></sitemap>')
+    lines.append('</sitemapindex>\n')
+    return HttpResponse('\n'.join(lines), content_type='application/xml')
+
+
+def sitemap_chunk(request, section, number):
+    section = SECTIONS.get(section)
+    if section is None:
+        raise Http404
+    base_url = _base_url(request)
+    key = (f'{SITEMAP_KEY_PREFIX}{section.name}:{number}:'
+           f'{md5(base_url.encode()).hexdigest()}')
+    entry = cache.get(key)
+    if (entry is None
+            or get_tag_versions(entry['tags']) != entry['tags']):
+        if number >= section.chunk_count():
+            raise Http404
+        entry = {
+            'tags': get_tag_versions(section.tags(number)),
+            'content': render_chunk(section, number, base_url),
+        }
+        cache.set(key, entry, SITEMAP_CACHE_TIMEOUT)
+    return gzip_xml_response(request, entry['content'])
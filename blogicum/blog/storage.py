@@ -0,0 +1,129 @@
+import gzip
+import hashlib
+import re
+from functools import cached_property
+from pathlib import PurePosixPath
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+HASHED_NAME_RE = re.compile(r'^[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}(\.\w+)?$')
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """Хранилище, где имя файла — SHA-256 его содержимого.
+
+    Файлы раскладываются по каталогам `ab/cd/abcd….ext`, одинаковые
+    загрузки сохраняются один раз. Содержимое по имени никогда не меняется,
+    поэтому такие файлы можно кешировать в браузере навсегда. Один файл
+    может принадлежать нескольким публикациям, так что приложение их
+    не удаляет.
+    """
+
+    chunk_size = 64 * 1024
+
+    def content_name(self, name, content):
+        digest = hashlib.sha256()
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        for chunk in content.chunks(self.chunk_size):
+            digest.update(chunk)
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        hexdigest = digest.hexdigest()
+        suffix = PurePosixPath(name).suffix.lower()
+        return f'{hexdigest[:2]}/{hexdigest[2:4]}/{hexdigest}{suffix}'
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.content_name(name, content)
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length=max_length)
+
+    @staticmethod
+    def is_hashed_name(name):
+        return bool(HASHED_NAME_RE.match(name))
+
+
+post_image_storage = ContentAddressedStorage()
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Манифест с хешами плюс заранее сжатые копии для статики.
+
+    После collectstatic рядом с каждым хешированным текстовым файлом
+    лежат `.gz` и, если установлен brotli, `.br`. Копия сохраняется,
+    только если она заметно меньше исходника.
+    """
+
+    compressible_extensions = {
+        '.css', '.js', '.mjs', '.map', '.json', '.svg', '.txt', '.xml',
+        '.html', '.ico', '.ttf', '.otf', '.eot',
+    }
+    min_compress_size = 256
+    max_compress_ratio = 0.95
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in self.hashed_files.values():
+            suffix = PurePosixPath(name).suffix.lower()
+            if suffix in self.compressible_extensions:
+                self.compress(name)
+
+    def compress(self, name):
+        with self.open(name) as file:
+            content = file.read()
+        if len(content) < self.min_compress_size:
+            return
+        for suffix, compressed in self.compressed_versions(content):
+            target = name + suffix
+            if self.exists(target):
+                self.delete(target)
+            if len(compressed) <= len(content) * self.max_compress_ratio:
+                self._save(target, ContentFile(compressed))
+
+    @staticmethod
+    def compressed_versions(content):
+        yield '.gz', gzip.compress(content, compresslevel=9, mtime=0)
+        if brotli is not None:
+            yield '.br', brotli.compress(content)
+
+    @cached_property
+    def _hashed_names(self):
+        return frozenset(self.hashed_files.values())
+
+    def is_hashed_name(self, name):
+        return name in self._hashed_names
+
+
+PRECOMPRESSED_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+
+def accepted_encodings(header):
+    """Кодировки из Accept-Encoding, которые клиент не запретил через q=0."""
+    encodings = set()
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        quality = params.strip()
+        if quality.startswith('q='):
+            try:
+                if float(quality[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        encodings.add(coding.strip().lower())
+    return encodings
@@ -0,0 +1,223 @@
+"""Синтетический контент для проверки производительности на больших объёмах.
+
+Распределения неравномерные, как в живом блоге: немногие авторы пишут
+большую часть постов, популярные категории и места встречаются чаще
+остальных, свежих постов больше, чем старых, а комментарии собираются
+под небольшой долей публикаций. Часть постов снята с публикации или
+отложена на будущее, часть категорий скрыта.
+
+Строки генерируются пачками и вставляются executemany с заранее
+подготовленным INSERT, без моделей и сигналов; производные данные
+(счётчики комментариев, поисковый индекс, кеши) досчитываются в конце
+одним проходом.
+"""
+import random
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.utils import timezone
+
+from blog.models import Category, Comment, Location, Post
+
+
+User = get_user_model()
+
+GENERATE_BATCH_SIZE = 10_000
+ZIPF_EXPONENT = 1.1
+COMMENT_ZIPF_EXPONENT = 0.8
+UNPUBLISHED_SHARE = 0.05
+FUTURE_SHARE = 0.02
+HIDDEN_CATEGORY_SHARE = 0.1
+NO_LOCATION_SHARE = 0.4
+
+WORDS = (
+    'утро вечер город море лес дорога дом работа книга музыка кофе чай '
+    'поезд самолёт друг семья погода снег дождь солнце парк улица окно '
+    'история рецепт путешествие выставка фильм спорт прогулка проект '
+    'идея вопрос ответ новость заметка воспоминание мечта планы выходные '
+    'осень зима весна лето кот собака сад огород велосипед горы река'
+).split()
+
+
+def zipf_weights(count, exponent=ZIPF_EXPONENT):
+    """Накопленные веса 1/rank^s для random.choices(cum_weights=…)."""
+    return list(accumulate(1 / rank ** exponent
+                           for rank in range(1, count + 1)))
+
+
+def _phrase(rng, low, high):
+    return ' '.join(rng.choices(WORDS, k=rng.randint(low, high)))
+
+
+def _insert(model, columns, rows):
+    """Вставить строки одним подготовленным INSERT через executemany."""
+    quote = connection.ops.quote_name
+    fields = [model._meta.get_field(name) for name in columns]
+    sql = (
+        f'INSERT INTO {quote(model._meta.db_table)} '
+        f'({", ".join(quote(field.column) for field in fields)}) '
+        f'VALUES ({", ".join(["%s"] * len(fields))})'
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, rows)
+
+
+def _new_pks(model, before):
+    return list(model._base_manager.filter(pk__gt=before).order_by(
+        'pk'
+    ).values_list('pk', flat=True))
+
+
+def _max_pk(model):
+    last = model._base_manager.order_by('-pk').values_list(
+        'pk', flat=True
+    ).first()
+    return last or 0
+
+
+class ContentGenerator:
+    """Наполнить базу; seed делает результат воспроизводимым."""
+
+    def __init__(self, prefix='synthetic', seed=0, days=365,
+                 batch_size=GENERATE_BATCH_SIZE):
+        self.prefix = prefix
+        self.rng = random.Random(seed)
+        self.days = days
+        self.batch_size = batch_size
+        self.now = timezone.now()
+        self.adapt = connection.ops.adapt_datetimefield_value
+
+    def _batches(self, rows):
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _write(self, model, columns, rows):
+        before = _max_pk(model)
+        for batch in self._batches(rows):
+            with transaction.atomic():
+                _insert(model, columns, batch)
+        return _new_pks(model, before)
+
+    def users(self, count):
+        joined = self.adapt(self.now - timedelta(days=self.days))
+        return self._write(User, [
+            'password', 'is_superuser', 'username', 'first_name',
+            'last_name', 'email', 'is_staff', 'is_active', 'date_joined',
+        ], (
+            ('!', False, f'{self.prefix}-user-{number}', '', '', '', False,
+             True, joined)
+            for number in range(1, count + 1)
+        ))
+
+    def categories(self, count):
+        created = self.adapt(self.now - timedelta(days=self.days))
+        return self._write(Category, [
+            'title', 'description', 'slug', 'is_published', 'created_at',
+        ], (
+            (_phrase(self.rng, 1, 3).capitalize(),
+             _phrase(self.rng, 8, 20), f'{self.prefix}-category-{number}',
+             self.rng.random() >= HIDDEN_CATEGORY_SHARE, created)
+            for number in range(1, count + 1)
+        ))
+
+    def locations(self, count):
+        created = self.adapt(self.now - timedelta(days=self.days))
+        return self._write(Location, ['name', 'is_published', 'created_at'], (
+            (f'{_phrase(self.rng, 1, 2).capitalize()} {number}', True,
+             created)
+            for number in range(1, count + 1)
+        ))
+
+    def _pub_date(self):
+        if self.rng.random() < FUTURE_SHARE:
+            return self.now + timedelta(days=self.rng.uniform(0.01, 30))
+        # Квадрат равномерной величины — свежих постов больше.
+        return self.now - timedelta(days=self.days * self.rng.random() ** 2)
+
+    def posts(self, count, authors, categories, locations):
+        """Вставить посты; вернуть [(pk, pub_date)] видимых сейчас."""
+        rng = self.rng
+        author_weights = zipf_weights(len(authors))
+        category_weights = zipf_weights(len(categories))
+        location_weights = zipf_weights(len(locations)) if locations else None
+        dates = []
+
+        def rows():
+            for _ in range(count):
+                pub_date = self._pub_date()
+                dates.append(pub_date)
+                location = None
+                if locations and rng.random() >= NO_LOCATION_SHARE:
+                    location = rng.choices(
+                        locations, cum_weights=location_weights
+                    )[0]
+                stamp = self.adapt(pub_date)
+                yield (
+                    _phrase(rng, 2, 8).capitalize(),
+                    '\n\n'.join(_phrase(rng, 20, 80)
+                                for _ in range(rng.randint(1, 5))),
+                    stamp,
+                    rng.choices(authors, cum_weights=author_weights)[0],
+                    rng.choices(categories, cum_weights=category_weights)[0],
+                    location, '', '{}', 0, pub_date <= self.now,
+                    rng.random() >= UNPUBLISHED_SHARE, stamp, stamp,
+                )
+
+        pks = self._write(Post, [
+            'title', 'text', 'pub_date', 'author', 'category', 'location',
+            'image', 'image_variants', 'comment_count', 'is_live',
+            'is_published', 'created_at', 'updated_at',
+        ], rows())
+        return [
+            (pk, pub_date) for pk, pub_date in zip(pks, dates)
+            if pub_date <= self.now
+        ]
+
+    def comments(self, count, posts, authors):
+        """Комментарии к уже вышедшим постам, популярные — чаще."""
+        if not posts:
+            return []
+        rng = self.rng
+        shuffled = posts[:]
+        rng.shuffle(shuffled)
+        post_weights = zipf_weights(len(shuffled), COMMENT_ZIPF_EXPONENT)
+        author_weights = zipf_weights(len(authors))
+
+        def rows():
+            for _ in range(count):
+                pk, pub_date = rng.choices(
+                    shuffled, cum_weights=post_weights
+                )[0]
+                created = pub_date + (self.now - pub_date) * rng.random()
+                yield (
+                    _phrase(rng, 3, 30).capitalize(), pk,
+                    rng.choices(authors, cum_weights=author_weights)[0],
+                    self.adapt(created),
+                )
+
+        return self._write(
+            Comment, ['text', 'post', 'author', 'created_at'], rows()
+        )
+
+    def generate(self, users, categories, locations, posts, comments):
+        """Создать всё по порядку зависимостей; вернуть число строк."""
+        author_pks = self.users(users)
+        category_pks = self.categories(categories)
+        location_pks = self.locations(locations)
+        live_posts = self.posts(posts, author_pks, category_pks, location_pks)
+        comment_pks = self.comments(comments, live_posts, author_pks)
+        return {
+            'users': len(author_pks),
+            'categories': len(category_pks),
+            'locations': len(location_pks),
+            'posts': posts,
+            'comments': len(comment_pks),
+        }
@@ -0,0 +1,53 @@
+import logging
+from pathlib import Path
+
+from django.conf import settings
+from django.template import TemplateSyntaxError, engines
+from django.template.utils import get_app_template_dirs
+
+
+logger = logging.getLogger(__name__)
+
+
+def iter_template_names():
+    engine = engines['django'].engine
+    dirs = [*engine.dirs, *get_app_template_dirs('templates')]
+    seen = set()
+    for directory in dirs:
+        for path in sorted(Path(directory).rglob('*.html')):
+            name = path.relative_to(directory).as_posix()
+            if name not in seen:
+                seen.add(name)
+                yield name
+
+
+def warm_template_cache():
+    """Скомпилировать все шаблоны, чтобы кеширующий загрузчик их запомнил.
+
+    Возвращает число скомпилированных шаблонов и список ошибок.
+    """
+    engine = engines['django'].engine
+    compiled, errors = 0, []
+    for name in iter_template_names():
+        try:
+            engine.get_template(name)
+        except TemplateSyntaxError as error:
+            errors.append((name, error))
+        else:
+            compiled += 1
+    return compiled, errors
+
+
+def warm_templates_on_startup():
+    """Прогреть кеш шаблонов при запуске WSGI/ASGI-приложения.
+
+    В режиме отладки шаблоны не кешируются, и прогрев не нужен. Ошибки
+    компиляции пишутся в лог: битый шаблон виден сразу после деплоя, а
+    не на первом запросе к странице.
+    """
+    if settings.DEBUG:
+        return
+    compiled, errors = warm_template_cache()
+    for name, error in errors:
+        logger.error('Шаблон %s не компилируется: %s', name, error)
+    logger.info('Скомпилировано шаблонов: %s', compiled)
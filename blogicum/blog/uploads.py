@@ -0,0 +1,106 @@
+from django import forms
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.template.defaultfilters import filesizeformat
+from PIL import Image, UnidentifiedImageError
+
+
+class RejectedUpload(SimpleUploadedFile):
+    """Пустой файл-заглушка вместо загрузки, отброшенной по размеру."""
+
+    def __init__(self, name, reason):
+        super().__init__(name, b'')
+        self.rejected_reason = reason
+
+
+class LimitedTemporaryFileUploadHandler(TemporaryFileUploadHandler):
+    """Пишет загрузки во временный файл порциями и обрывает слишком большие.
+
+    Лишние байты не сохраняются ни в память, ни на диск, а форма получает
+    RejectedUpload с понятной причиной.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+        self.rejected = False
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.rejected:
+            return None
+        self.received += len(raw_data)
+        if self.received > settings.UPLOAD_MAX_FILE_SIZE:
+            self.rejected = True
+            self.file.close()
+            return None
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        if self.rejected:
+            return RejectedUpload(self.file_name, (
+                'Файл слишком большой: допускается не больше '
+                f'{filesizeformat(settings.UPLOAD_MAX_FILE_SIZE)}.'
+            ))
+        return super().file_complete(file_size)
+
+
+def inspect_image_header(file):
+    """Прочитать формат и размеры изображения без декодирования пикселей.
+
+    Для нераспознанного файла возвращает (None, None).
+    """
+    position = file.tell()
+    try:
+        with Image.open(file) as image:
+            return image.format, image.size
+    except UnidentifiedImageError:
+        return None, None
+    finally:
+        file.seek(position)
+
+
+class BoundedImageField(forms.ImageField):
+    """ImageField, который отсекает опасные файлы до полного разбора."""
+
+    default_error_messages = {
+        'format': 'Поддерживаются только форматы: %(formats)s.',
+        'pixels': (
+            'Слишком большое изображение: %(width)s×%(height)s, '
+            'допускается не больше %(limit)s пикселей.'
+        ),
+    }
+
+    def to_python(self, data):
+        reason = getattr(data, 'rejected_reason', None)
+        if reason:
+            raise forms.ValidationError(reason, code='size')
+        if data is not None and hasattr(data, 'tell'):
+            self.check_header(data)
+        return super().to_python(data)
+
+    def check_header(self, data):
+        try:
+            image_format, size = inspect_image_header(data)
+        except Image.DecompressionBombError:
+            raise forms.ValidationError(
+                self.error_messages['pixels'], code='pixels',
+                params={'width': '?', 'height': '?',
+                        'limit': settings.POST_IMAGE_MAX_PIXELS},
+            )
+        if image_format is None:
+            raise forms.ValidationError(
+                self.error_messages['invalid_image'], code='invalid_image'
+            )
+        if image_format not in settings.POST_IMAGE_FORMATS:
+            raise forms.ValidationError(
+                self.error_messages['format'], code='format',
+                params={'formats': ', '.join(settings.POST_IMAGE_FORMATS)},
+            )
+        width, height = size
+        if width * height > settings.POST_IMAGE_MAX_PIXELS:
+            raise forms.ValidationError(
+                self.error_messages['pixels'], code='pixels',
+                params={'width': width, 'height': height,
+                        'limit': settings.POST_IMAGE_MAX_PIXELS},
+            )
@@ -1,6 +1,6 @@
 from django.urls import path, include
 
-from . import views
+from . import api, feeds, sitemaps, views
 
 
 app_name = 'blog'
@@ -18,6 +18,9 @@ posts_urls = [
     path('<int:post_id>/edit/',
          views.edit_post,
          name='edit_post'),
+    path('<int:post_id>/comments/',
+         views.post_comments,
+         name='post_comments'),
     path('<int:post_id>/comment/',
          views.add_comment,
          name='add_comment'),
@@ -29,17 +32,63 @@ posts_urls = [
          name='delete_comment'),
 ]
 
+api_urls = [
+    path('posts/',
+         api.posts,
+         name='api_posts'),
+    path('posts/<int:pk>/',
+         api.post_detail,
+         name='api_post'),
+    path('posts/<int:post_id>/comments/',
+         api.post_comments,
+         name='api_post_comments'),
+    path('categories/',
+         api.categories,
+         name='api_categories'),
+    path('locations/',
+         api.locations,
+         name='api_locations'),
+]
+
 urlpatterns = [
     path('',
          views.index,
          name='index'),
     path('posts/', include(posts_urls)),
+    path('api/', include(api_urls)),
+    path('sitemap.xml',
+         sitemaps.sitemap_index,
+         name='sitemap_index'),
+    path('sitemap-<str:section>-<int:number>.xml',
+         sitemaps.sitemap_chunk,
+         name='sitemap_chunk'),
+    path('feed/rss/',
+         feeds.latest_posts_rss,
+         name='feed_rss'),
+    path('feed/atom/',
+         feeds.latest_posts_atom,
+         name='feed_atom'),
     path('category/<slug:category_slug>/',
          views.category_posts,
          name='category_posts'),
+    path('category/<slug:category_slug>/rss/',
+         feeds.category_posts_rss,
+         name='category_feed_rss'),
+    path('category/<slug:category_slug>/atom/',
+         feeds.category_posts_atom,
+         name='category_feed_atom'),
+    path('search/',
+         views.search,
+         name='search'),
     path('profile/<str:username>/',
          views.profile,
          name='profile'),
+    path('profile/<str:username>/rss/',
+         feeds.author_posts_rss,
+         name='author_feed_rss'),
+    path('profile/<str:username>/atom/',
+         feeds.author_posts_atom,
+         name='author_feed_atom'),
     path('edit_profile/',
          views.edit_profile,
          name='edit_profile'),
@@ -1,30 +1,327 @@
-from django.utils import timezone
+import binascii
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+from uuid import uuid4
+
+from django.utils.functional import cached_property
+from django.core.cache import cache
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from django.contrib.auth import get_user_model
-from django.db.models import Count
+from django.db import connections
+from django.db.models import (
+    BooleanField, Count, ExpressionWrapper, IntegerField, Min, OuterRef, Q,
+    Subquery,
+)
+from django.db.models.functions import Coalesce
+from django.http import Http404
+from django.shortcuts import get_object_or_404
 
-from blog.models import Post
+from blog.models import Comment, Post
 
 
 User = get_user_model()
 
 NUM_POSTS_TO_DISPLAY = 10
+NUM_COMMENTS_TO_DISPLAY = 50
+COUNT_CACHE_TIMEOUT = 60
+COUNT_ESTIMATE_THRESHOLD = 100_000
+COUNT_GENERATION_KEY = 'blog:feed_count_generation'
+NEXT_RELEASE_KEY = 'blog:next_release_at'
+NEXT_RELEASE_TIMEOUT = 60
+# Граница BIGINT: id больше неё драйвер базы не примет в параметрах.
+MAX_PK = 2 ** 63 - 1
+
+
+def published_q(prefix=''):
+    """Условие видимости публикации; prefix — путь до поста, напр. 'post__'."""
+    return Q(**{
+        f'{prefix}is_live': True,
+        f'{prefix}category__is_published': True,
+        f'{prefix}is_published': True,
+    })
 
 
 def get_published_posts():
     return Post.objects.select_related(
         'author', 'location', 'category'
-    ).filter(
-        pub_date__lte=timezone.now(),
-        category__is_published=True,
-        is_published=True,
+    ).filter(published_q())
+
+
+def wants_fragment(request):
+    """Клиент просит вернуть только изменённый фрагмент страницы."""
+    return (request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+            or 'partial' in request.GET)
+
+
+def get_visible_post_or_404(request, post_id):
+    """Загрузить пост одним запросом вместе с признаком is_visible.
+
+    Неопубликованный пост отдаётся только его автору, остальным — 404.
+    """
+    post = get_object_or_404(
+        Post.objects.select_related(
+            'author', 'location', 'category'
+        ).annotate(is_visible=ExpressionWrapper(
+            published_q(), output_field=BooleanField()
+        )),
+        pk=post_id,
     )
+    if not post.is_visible and request.user.pk != post.author_id:
+        raise Http404
+    return post
+
+
+def get_comment_or_404(request, post_id, comment_id):
+    """Комментарий к посту, который текущий пользователь может видеть."""
+    return get_object_or_404(
+        Comment.objects.select_related('post', 'author').filter(
+            published_q('post__') | Q(post__author=request.user)
+        ),
+        pk=comment_id,
+        post_id=post_id,
+    )
+
+
+def encode_key(moment, pk):
+    """Токен курсора из пары (дата, id); обратная операция — decode_cursor."""
+    raw = f'{moment.isoformat()}|{pk}'
+    return urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def encode_cursor(obj, date_field='pub_date'):
+    return encode_key(getattr(obj, date_field), obj.pk)
+
+
+def parse_pk(value):
+    """Разобрать id из токена курсора; ValueError, если он вне BIGINT."""
+    pk = int(value)
+    if not -MAX_PK - 1 <= pk <= MAX_PK:
+        raise ValueError(f'id вне диапазона: {value}')
+    return pk
+
+
+def decode_cursor(token):
+    """Вернуть пару (дата, id) из токена или None, если он испорчен."""
+    try:
+        raw = urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode()
+        moment, pk = raw.split('|')
+        return datetime.fromisoformat(moment), parse_pk(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+class CursorPage:
+    """Страница, отобранная по ключу (дата, id) без OFFSET."""
+
+    is_cursor = True
+
+    def __init__(self, object_list, has_next, has_previous,
+                 date_field='pub_date'):
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.date_field = date_field
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if self._has_next and self.object_list:
+            return encode_cursor(self.object_list[-1], self.date_field)
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self._has_previous and self.object_list:
+            return encode_cursor(self.object_list[0], self.date_field)
+        return None
+
+
+def get_cursor_page(posts, after=None, before=None,
+                    per_page=NUM_POSTS_TO_DISPLAY):
+    """Отдать страницу ленты после или до курсора одним range-запросом."""
+    if before is not None:
+        pub_date, pk = before
+        rows = list(posts.filter(
+            Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, pk__gt=pk)
+        ).order_by('pub_date', 'pk')[:per_page + 1])
+        has_previous = len(rows) > per_page
+        return CursorPage(rows[:per_page][::-1], True, has_previous)
+    if after is not None:
+        pub_date, pk = after
+        posts = posts.filter(
+            Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=pk)
+        )
+    rows = list(posts.order_by('-pub_date', '-pk')[:per_page + 1])
+    return CursorPage(rows[:per_page], len(rows) > per_page,
+                      after is not None)
+
+
+def get_comment_page(post, after=None, per_page=NUM_COMMENTS_TO_DISPLAY):
+    """Комментарии поста вместе с авторами, порциями по (created_at, id)."""
+    comments = post.comments.select_related('author')
+    if after is not None:
+        created_at, pk = after
+        comments = comments.filter(
+            Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk)
+        )
+    rows = list(comments.order_by('created_at', 'pk')[:per_page + 1])
+    return CursorPage(rows[:per_page], len(rows) > per_page,
+                      after is not None, date_field='created_at')
+
+
+def recount_comment_counts(posts):
+    """Пересчитать comment_count у постов одним UPDATE с подзапросом."""
+    counts = Comment.objects.filter(
+        post=OuterRef('pk')
+    ).order_by().values('post').annotate(total=Count('pk')).values('total')
+    return posts.update(comment_count=Coalesce(
+        Subquery(counts, output_field=IntegerField()), 0
+    ))
+
+
+def invalidate_feed_counts():
+    cache.set(COUNT_GENERATION_KEY, uuid4().hex, None)
+
+
+def count_generation_key(model):
+    """Ключ поколения счётчиков списков одной модели (для админки)."""
+    return f'{COUNT_GENERATION_KEY}:{model._meta.label_lower}'
+
+
+def invalidate_model_counts(*models):
+    cache.set_many(
+        {count_generation_key(model): uuid4().hex for model in models}, None
+    )
+
+
+def next_release_at():
+    return Post.objects.filter(is_live=False).aggregate(
+        next_at=Min('pub_date')
+    )['next_at']
+
+
+def remember_next_release():
+    """Запомнить в кеше время ближайшей отложенной публикации.
+
+    Вызывается при записи постов, чтобы запросам на чтение хватало
+    одного обращения к кешу без SQL. Код, который пишет посты в обход
+    save() (bulk_create, update(), сырой SQL), должен вызвать её сам.
+    """
+    next_at = next_release_at()
+    timestamp = next_at.timestamp() if next_at else float('inf')
+    cache.set(NEXT_RELEASE_KEY, timestamp, NEXT_RELEASE_TIMEOUT)
+    return timestamp
+
+
+def _sqlite_table_estimate(connection, queryset):
+    """Размер таблицы по диапазону rowid; None для запроса с фильтрами.
+
+    Удалённые строки завышают оценку, зато оба подзапроса — это один
+    спуск по B-дереву, и не нужна статистика ANALYZE.
+    """
+    if queryset.query.where or queryset.query.distinct:
+        return None
+    table = connection.ops.quote_name(queryset.model._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT (SELECT MAX(rowid) FROM {table}) '
+            f'- (SELECT MIN(rowid) FROM {table}) + 1'
+        )
+        return cursor.fetchone()[0]
+
+
+def estimate_count(queryset):
+    """Оценка числа строк по плану запроса; None, если СУБД не умеет.
+
+    SQLite оценивает только запрос без фильтров — по диапазону rowid.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor == 'sqlite':
+        return _sqlite_table_estimate(connection, queryset)
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]['Plan']['Plan Rows']
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator, который хранит число публикаций ленты в кеше.
+
+    Ключ строится из области ленты (главная, категория, автор) и поколения,
+    которое сбрасывается при сохранении и удалении публикаций; другое
+    поколение задаёт generation_key. С estimate=True на больших таблицах
+    вместо COUNT(*) берётся оценка планировщика.
+    """
+
+    def __init__(self, object_list, per_page, scope=None, estimate=False,
+                 timeout=COUNT_CACHE_TIMEOUT,
+                 generation_key=COUNT_GENERATION_KEY, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.scope = scope
+        self.estimate = estimate
+        self.timeout = timeout
+        self.generation_key = generation_key
+
+    def _count_cache_key(self):
+        generation = cache.get_or_set(
+            self.generation_key, uuid4().hex, None
+        )
+        return f'blog:feed_count:{generation}:{self.scope}'
+
+    def _compute_count(self):
+        if self.estimate:
+            estimated = estimate_count(self.object_list)
+            if (estimated is not None
+                    and estimated >= COUNT_ESTIMATE_THRESHOLD):
+                return estimated
+        return super().count
+
+    @cached_property
+    def count(self):
+        if self.scope is None:
+            return self._compute_count()
+        key = self._count_cache_key()
+        count = cache.get(key)
+        if count is None:
+            count = self._compute_count()
+            cache.set(key, count, self.timeout)
+        return count
 
 
-def get_paginated_posts(request, posts):
-    paginator = Paginator(posts.order_by('-pub_date')
-                          .annotate(comment_count=Count("comments")),
-                          NUM_POSTS_TO_DISPLAY)
+def get_paginated_posts(request, posts, keyset=False, scope=None):
+    if keyset and 'page' not in request.GET:
+        after = request.GET.get('after')
+        before = request.GET.get('before')
+        return get_cursor_page(
+            posts,
+            after=decode_cursor(after) if after else None,
+            before=decode_cursor(before) if before else None,
+        )
+    paginator = CachedCountPaginator(posts.order_by('-pub_date', '-pk'),
+                                     NUM_POSTS_TO_DISPLAY, scope=scope)
     page = request.GET.get('page')
     try:
         page_obj = paginator.page(page)
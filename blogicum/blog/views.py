@@ -1,10 +1,31 @@
+import mimetypes
+from http import HTTPStatus
+from pathlib import Path
+
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import get_user_model
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
 from django.shortcuts import render, get_object_or_404, redirect
+from django.urls import reverse
+from django.views.static import serve
 
 from blog.forms import CommentForm, EditForm, PostForm
-from blog.models import Category, Comment, Post
-from blog.utils import get_published_posts, get_paginated_posts
+from blog.instrumentation import query_budget
+from blog.models import Category, Post
+from blog.images import VARIANT_DIR
+from blog.page_cache import cache_anonymous_page, post_tags, tag_page
+from blog.search import decode_rank_cursor, search_posts
+from blog.storage import (
+    PRECOMPRESSED_SUFFIXES, CompressedManifestStaticFilesStorage,
+    ContentAddressedStorage, accepted_encodings,
+)
+from blog.utils import (
+    decode_cursor, get_comment_or_404, get_comment_page, get_paginated_posts,
+    get_published_posts, get_visible_post_or_404, wants_fragment,
+)
 
 
 User = get_user_model()
@@ -12,34 +33,54 @@ User = get_user_model()
 NUM_POSTS_TO_DISPLAY = 10
 
 
+@query_budget(4)
+@cache_anonymous_page
 def index(request):
+    tag_page(request, 'feeds', 'feed')
     published_posts = get_published_posts()
-    page_obj = get_paginated_posts(request, published_posts)
+    page_obj = get_paginated_posts(request, published_posts,
+                                   keyset=True, scope='index')
+    tag_page(request, post_tags(page_obj))
     return render(request, 'blog/index.html', {'page_obj': page_obj})
 
 
+@query_budget(4)
+@cache_anonymous_page
 def post_detail(request, id):
     form = CommentForm()
-    post = get_object_or_404(Post.objects.select_related('author', 'location',
-                                                         'category'),
-                             pk=id)
-    if request.user != post.author:
-        posts = get_published_posts()
-        post = get_object_or_404(posts, pk=id)
-        comments = post.comments.all()
-        return render(request, 'blog/detail.html', {'post': post, 'form': form,
-                                                    'comments': comments})
-    comments = post.comments.all()
+    tag_page(request, f'post:{id}')
+    post = get_visible_post_or_404(request, id)
+    after = request.GET.get('comments_after')
+    comments = get_comment_page(post, decode_cursor(after) if after else None)
+    tag_page(request, post_tags([post]),
+             {f'user:{comment.author_id}' for comment in comments})
     return render(request, 'blog/detail.html', {'post': post, 'form': form,
                                                 'comments': comments})
 
 
+@query_budget(4)
+@cache_anonymous_page
+def post_comments(request, post_id):
+    tag_page(request, f'post:{post_id}')
+    post = get_visible_post_or_404(request, post_id)
+    after = request.GET.get('after')
+    comments = get_comment_page(post, decode_cursor(after) if after else None)
+    tag_page(request, {f'user:{comment.author_id}' for comment in comments})
+    return render(request, 'includes/comment_list.html',
+                  {'post': post, 'comments': comments})
+
+
+@query_budget(5)
+@cache_anonymous_page
 def category_posts(request, category_slug):
+    tag_page(request, 'feeds')
     category = get_object_or_404(
         Category,
         slug=category_slug,
         is_published=True
     )
+    tag_page(request, f'category-feed:{category.pk}',
+             f'category:{category.pk}')
     posts = get_published_posts().filter(
         category=category,
     ).select_related(
@@ -47,11 +88,23 @@ def category_posts(request, category_slug):
         'author',
         'category'
     )
-    page_obj = get_paginated_posts(request, posts)
+    page_obj = get_paginated_posts(request, posts, keyset=True,
+                                   scope=f'category:{category.pk}')
+    tag_page(request, post_tags(page_obj))
     return render(request, 'blog/category.html', {'category': category,
                                                   'page_obj': page_obj})
 
 
+@query_budget(3)
+def search(request):
+    query = request.GET.get('q', '').strip()
+    after = request.GET.get('after')
+    page_obj = search_posts(query,
+                            decode_rank_cursor(after) if after else None)
+    return render(request, 'blog/search.html', {'query': query,
+                                                'page_obj': page_obj})
+
+
 @login_required
 def create_post(request):
     form = PostForm(
@@ -65,12 +118,22 @@ def create_post(request):
     return render(request, 'blog/create.html', {'form': form})
 
 
+@query_budget(5)
+@cache_anonymous_page
 def profile(request, username):
+    tag_page(request, 'feeds')
     profile = get_object_or_404(User, username=username)
-    posts_query = profile.posts.all()
+    tag_page(request, f'user-feed:{profile.pk}', f'user:{profile.pk}')
+    posts_query = profile.posts.select_related(
+        'author', 'location', 'category'
+    )
+    scope = f'profile:{profile.pk}:all'
     if request.user != profile:
-        posts_query = get_published_posts()
-    page_obj = get_paginated_posts(request, posts_query)
+        posts_query = get_published_posts().filter(author=profile)
+        scope = f'profile:{profile.pk}:published'
+    page_obj = get_paginated_posts(request, posts_query, keyset=True,
+                                   scope=scope)
+    tag_page(request, post_tags(page_obj))
     return render(request, 'blog/profile.html', {
         'page_obj': page_obj,
         'profile': profile,
@@ -115,22 +178,45 @@ def delete_post(request, post_id):
     return render(request, 'blog/create.html', {'post': post})
 
 
+def render_comment_fragment(request, comment, status=HTTPStatus.OK):
+    return render(request, 'includes/comment_list.html',
+                  {'post': comment.post, 'comments': [comment]},
+                  status=status)
+
+
+def render_comment_form_fragment(request, form, action):
+    return render(request, 'includes/comment_form.html',
+                  {'form': form, 'action': action},
+                  status=HTTPStatus.BAD_REQUEST)
+
+
 @login_required
 def add_comment(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
+    post = get_visible_post_or_404(request, post_id)
     form = CommentForm(request.POST)
+    partial = wants_fragment(request)
     if form.is_valid():
         comments = form.save(commit=False)
         comments.author = request.user
         comments.post = post
         comments.save()
+        if partial:
+            return render_comment_fragment(request, comments,
+                                           status=HTTPStatus.CREATED)
+    elif partial:
+        return render_comment_form_fragment(
+            request, form, reverse('blog:add_comment', args=[post_id])
+        )
     return redirect('blog:post_detail', id=post_id)
 
 
 @login_required
 def edit_comment(request, post_id, comment_id):
-    comments = get_object_or_404(Comment, id=comment_id)
+    comments = get_comment_or_404(request, post_id, comment_id)
+    partial = wants_fragment(request)
     if request.user != comments.author:
+        if partial:
+            raise PermissionDenied
         return redirect('blog:post_detail', post_id)
     form = CommentForm(
         request.POST or None,
@@ -138,17 +224,63 @@ def edit_comment(request, post_id, comment_id):
         instance=comments)
     if form.is_valid():
         form.save()
+        if partial:
+            return render_comment_fragment(request, comments)
         return redirect('blog:post_detail', post_id)
+    if partial and request.method == 'POST':
+        return render_comment_form_fragment(
+            request, form,
+            reverse('blog:edit_comment', args=[post_id, comment_id])
+        )
     return render(request, 'blog/comment.html',
                   {'form': form, 'comment': comments})
 
 
 @login_required
 def delete_comment(request, post_id, comment_id):
-    comments = get_object_or_404(Comment, id=comment_id)
+    comments = get_comment_or_404(request, post_id, comment_id)
+    partial = wants_fragment(request)
     if request.user != comments.author:
+        if partial:
+            raise PermissionDenied
         return redirect('blog:post_detail', post_id)
     if request.method == 'POST':
         comments.delete()
+        if partial:
+            return HttpResponse(status=HTTPStatus.NO_CONTENT)
         return redirect('blog:post_detail', post_id)
     return render(request, 'blog/comment.html', {'comment': comments})
+
+
+def serve_media(request, path):
+    response = serve(request, path, document_root=settings.MEDIA_ROOT)
+    if (ContentAddressedStorage.is_hashed_name(path)
+            or path.startswith(f'{VARIANT_DIR}/')):
+        response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+
+def serve_static(request, path):
+    """Отдать статику, выбрав заранее сжатую копию по Accept-Encoding."""
+    root = Path(settings.STATIC_ROOT)
+    accepted = accepted_encodings(request.headers.get('Accept-Encoding', ''))
+    variants = [
+        (encoding, path + suffix)
+        for encoding, suffix in PRECOMPRESSED_SUFFIXES.items()
+        if (root / (path + suffix)).is_file()
+    ]
+    encoding, name = next((
+        (encoding, name) for encoding, name in variants
+        if encoding in accepted or '*' in accepted
+    ), (None, path))
+    response = serve(request, name, document_root=root)
+    if encoding:
+        content_type, _ = mimetypes.guess_type(path)
+        response['Content-Type'] = content_type or 'application/octet-stream'
+        response['Content-Encoding'] = encoding
+    if variants:
+        response['Vary'] = 'Accept-Encoding'
+    if (isinstance(staticfiles_storage, CompressedManifestStaticFilesStorage)
+            and staticfiles_storage.is_hashed_name(path)):
+        response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
@@ -1,5 +1,4 @@
 from django.conf import settings
-from django.conf.urls.static import static
 
 from django.contrib import admin
 from django.contrib.auth.forms import UserCreationForm
@@ -7,6 +6,8 @@ from django.contrib.auth.forms import UserCreationForm
 from django.urls import include, path, reverse_lazy
 from django.views.generic.edit import CreateView
 
+from blog.views import serve_media, serve_static
+
 
 handler500 = 'pages.views.server_error'
 handler404 = 'pages.views.page_not_found'
@@ -32,5 +33,11 @@ urlpatterns = [
 if settings.DEBUG:
     import debug_toolbar
     urlpatterns += (path('__debug__/', include(debug_toolbar.urls)),)
-    urlpatterns += static(settings.MEDIA_URL,
-                          document_root=settings.MEDIA_ROOT)
+
+if settings.SERVE_MEDIA:
+    urlpatterns += (path(f'{settings.MEDIA_URL.lstrip("/")}<path:path>',
+                         serve_media),)
+
+if settings.SERVE_STATIC:
+    urlpatterns += (path(f'{settings.STATIC_URL.lstrip("/")}<path:path>',
+                         serve_static),)
@@ -19,6 +19,7 @@ from typing import (
 import pytest
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.db.models import Model, Field
 from django.forms import BaseForm
 from django.http import HttpResponse
@@ -41,6 +42,29 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(scope="session", autouse=True)
+def isolated_cache(tmp_path_factory):
+    location = tmp_path_factory.mktemp("cache")
+    with override_settings(CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": str(location),
+        },
+    }):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_cache(isolated_cache):
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def disable_image_variant_worker():
+    with override_settings(IMAGE_VARIANT_WORKERS=0):
+        yield
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -140,3 +140,29 @@ def create_post_context_form_item(
         ),
     )
     return result
+
+
+@pytest.fixture
+def make_posts(mixer: Mixer, user, published_category):
+    """Фабрика видимых постов; любое поле можно переопределить.
+
+    По умолчанию пост опубликован вчера автором `user` в опубликованной
+    категории и без места.
+    """
+    def make(count, **fields):
+        defaults = {
+            "author": user,
+            "category": published_category,
+            "location": None,
+            "is_published": True,
+            "pub_date": timezone.now() - timedelta(days=1),
+        }
+        return mixer.cycle(count).blend("blog.Post", **{**defaults, **fields})
+    return make
+
+
+@pytest.fixture
+def make_post(make_posts):
+    def make(title, text="", **fields):
+        return make_posts(1, title=title, text=text, **fields)[0]
+    return make
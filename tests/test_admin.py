@@ -0,0 +1,99 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.models import Comment, Post
+from blog.moderation import delete_objects
+from blog.utils import estimate_count
+
+
+def changelist_queries(client, url):
+    cache.clear()
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 200
+    return [query["sql"] for query in queries]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url", [
+    "/admin/blog/post/", "/admin/blog/comment/",
+])
+def test_changelist_queries_do_not_grow_with_rows(
+        admin_client, make_posts, mixer, url
+):
+    posts = make_posts(2)
+    mixer.cycle(2).blend("blog.Comment", post=posts[0])
+    few = changelist_queries(admin_client, url)
+    posts = make_posts(8)
+    mixer.cycle(8).blend("blog.Comment", post=posts[-1])
+    assert len(changelist_queries(admin_client, url)) == len(few)
+
+
+@pytest.mark.django_db
+def test_post_changelist_skips_full_count(admin_client, make_posts):
+    make_posts(3)
+    queries = changelist_queries(admin_client, "/admin/blog/post/")
+    assert sum("COUNT(" in sql for sql in queries) == 1
+    queries = changelist_queries(admin_client,
+                                 "/admin/blog/post/?is_published__exact=1")
+    assert sum("COUNT(" in sql for sql in queries) == 1
+
+
+@pytest.mark.django_db
+def test_admin_filters_and_search(admin_client, make_posts, user,
+                                  another_user):
+    make_posts(2, title="Обычный пост", author=another_user)
+    Post.objects.filter(pk=make_posts(1, author=user)[0].pk).update(
+        title="Не попадёт в индекс")
+    mine = make_posts(1, author=user, title="Редкое слово")[0]
+
+    def listed(query):
+        response = admin_client.get("/admin/blog/post/", query)
+        return [post.pk for post in response.context["cl"].result_list]
+
+    assert listed({"q": "редкое"}) == [mine.pk]
+    assert listed({"q": "попадёт"}) == []
+    assert len(listed({"author": user.username})) == 2
+    response = admin_client.get("/admin/blog/post/")
+    assert 'name="author"' in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_sqlite_estimate_uses_rowid_range(make_posts):
+    if connection.vendor != "sqlite":
+        pytest.skip("rowid is SQLite-specific")
+    posts = make_posts(5)
+    posts[2].delete()
+    assert estimate_count(Post.objects.all()) == 5
+    assert estimate_count(Post.objects.filter(is_published=True)) is None
+
+
+@pytest.mark.django_db
+def test_bench_admin_rolls_back(published_category):
+    out = StringIO()
+    call_command("bench_admin", posts=300, comments=100, authors=5,
+                 iterations=2, target_ms=10_000, stdout=out)
+    assert "posts_search" in out.getvalue()
+    assert not Post.objects.exists()
+
+
+@pytest.mark.django_db
+def test_comment_changelist_count_follows_deletes(admin_client, make_posts,
+                                                  mixer):
+    post = make_posts(1)[0]
+    mixer.cycle(3).blend("blog.Comment", post=post)
+    url = "/admin/blog/comment/"
+    assert admin_client.get(url).context["cl"].result_count == 3
+
+    Comment.objects.first().delete()
+    assert admin_client.get(url).context["cl"].result_count == 2
+
+    delete_objects(Comment.objects.all())
+    assert admin_client.get(url).context["cl"].result_count == 0
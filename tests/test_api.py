@@ -0,0 +1,113 @@
+from datetime import datetime, timedelta
+
+import pytest
+from django.utils import timezone
+
+from blog.utils import encode_key
+
+OVERSIZED_PK_CURSOR = encode_key(datetime(2020, 1, 1, tzinfo=timezone.utc),
+                                 10 ** 23)
+
+
+@pytest.fixture
+def api_posts(make_post, another_user, published_location):
+    now = timezone.now()
+    return {
+        "newest": make_post("Новый", pub_date=now - timedelta(hours=1),
+                            location=published_location),
+        "older": make_post("Старый", author=another_user),
+        "oldest": make_post("Самый старый", pub_date=now - timedelta(days=2)),
+        "hidden": make_post("Скрытый", is_published=False),
+        "future": make_post("Будущий", pub_date=now + timedelta(days=1)),
+    }
+
+
+def titles(response):
+    return [item["title"] for item in response.json()["results"]]
+
+
+@pytest.mark.django_db
+def test_posts_follow_visibility_and_cursor(client, api_posts):
+    response = client.get("/api/posts/?limit=2")
+    assert response.status_code == 200
+    assert titles(response) == ["Новый", "Старый"]
+
+    next_url = response.json()["next"]
+    assert "limit=2" in next_url
+    response = client.get(next_url)
+    assert titles(response) == ["Самый старый"]
+    assert response.json()["next"] is None
+
+
+@pytest.mark.django_db
+def test_sparse_fields_select_only_requested_columns(
+        client, api_posts, user, published_location,
+        django_assert_num_queries
+):
+    with django_assert_num_queries(1) as queries:
+        response = client.get("/api/posts/?fields=id,author,location")
+    assert response.json()["results"][0] == {
+        "id": api_posts["newest"].pk,
+        "author": user.username,
+        "location": published_location.name,
+    }
+    sql = queries.captured_queries[0]["sql"]
+    assert '"blog_post"."text"' not in sql
+    assert '"blog_post"."title"' not in sql
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url", [
+    "/api/posts/?fields=id,password",
+    "/api/posts/?limit=0",
+    "/api/posts/?limit=1000",
+    "/api/posts/?after=broken",
+    f"/api/posts/?after={OVERSIZED_PK_CURSOR}",
+])
+def test_bad_parameters_are_400(client, api_posts, url):
+    response = client.get(url)
+    assert response.status_code == 400
+    assert "error" in response.json()
+
+
+@pytest.mark.django_db
+def test_post_detail_and_comments(client, api_posts, mixer, user):
+    post = api_posts["newest"]
+    mixer.cycle(3).blend("blog.Comment", post=post, author=user)
+    assert client.get(f"/api/posts/{post.pk}/").json()["title"] == "Новый"
+    assert client.get(
+        f"/api/posts/{api_posts['hidden'].pk}/").status_code == 404
+    assert client.get(
+        f"/api/posts/{api_posts['future'].pk}/comments/").status_code == 404
+
+    response = client.get(f"/api/posts/{post.pk}/comments/?limit=2")
+    assert len(response.json()["results"]) == 2
+    response = client.get(response.json()["next"])
+    assert len(response.json()["results"]) == 1
+
+
+@pytest.mark.django_db
+def test_categories_and_locations(client, api_posts, published_category,
+                                  published_location, mixer):
+    mixer.blend("blog.Category", is_published=False, slug="hidden")
+    slugs = [item["slug"]
+             for item in client.get("/api/categories/").json()["results"]]
+    assert slugs == [published_category.slug]
+    names = [item["name"]
+             for item in client.get("/api/locations/").json()["results"]]
+    assert published_location.name in names
+
+
+@pytest.mark.django_db
+def test_cached_response_is_refreshed_on_change(
+        client, api_posts, django_assert_num_queries
+):
+    first = client.get("/api/posts/")
+    with django_assert_num_queries(0):
+        response = client.get("/api/posts/", HTTP_IF_NONE_MATCH=first["ETag"])
+    assert response.status_code == 304
+
+    post = api_posts["newest"]
+    post.title = "Исправленный"
+    post.save()
+    assert titles(client.get("/api/posts/"))[0] == "Исправленный"
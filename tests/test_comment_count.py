@@ -0,0 +1,53 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Comment, Post
+
+
+@pytest.mark.django_db
+def test_comment_count_follows_comments(mixer, post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(3).blend("blog.Comment", post=post)
+    post.refresh_from_db()
+    assert post.comment_count == 3
+
+    comments[0].delete()
+    post.refresh_from_db()
+    assert post.comment_count == 2
+
+    Comment.objects.filter(post=post).delete()
+    post.refresh_from_db()
+    assert post.comment_count == 0
+
+
+@pytest.mark.django_db
+def test_recount_comments_command(mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(2).blend("blog.Comment", post=post)
+    Post.objects.update(comment_count=42)
+
+    call_command("recount_comments")
+
+    post.refresh_from_db()
+    assert post.comment_count == 2
+
+
+@pytest.mark.django_db
+def test_post_delete_skips_per_comment_updates(
+        mixer, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(5).blend("blog.Comment", post=post)
+    with CaptureQueriesContext(connection) as queries:
+        post.delete()
+    assert not [q for q in queries if q["sql"].startswith("UPDATE")]
+    assert not Comment.objects.exists()
+
+    other = mixer.blend("blog.Post", category=post.category,
+                        location=None)
+    mixer.cycle(2).blend("blog.Comment", post=other)
+    other.comments.first().delete()
+    other.refresh_from_db()
+    assert other.comment_count == 1
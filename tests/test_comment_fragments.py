@@ -0,0 +1,45 @@
+from http import HTTPStatus
+
+import pytest
+
+PARTIAL = {"HTTP_X_REQUESTED_WITH": "XMLHttpRequest"}
+
+
+@pytest.mark.django_db
+def test_comment_actions_return_fragments(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    response = user_client.post(
+        f"/posts/{post.id}/comment/", {"text": "Первый"}, **PARTIAL)
+    assert response.status_code == HTTPStatus.CREATED
+    content = response.content.decode()
+    assert "Первый" in content and "<html" not in content
+    comment = post.comments.get()
+
+    response = user_client.post(
+        f"/posts/{post.id}/edit_comment/{comment.id}/",
+        {"text": "Исправленный"}, **PARTIAL)
+    assert response.status_code == HTTPStatus.OK
+    assert "Исправленный" in response.content.decode()
+
+    response = user_client.post(
+        f"/posts/{post.id}/comment/", {"text": ""}, **PARTIAL)
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert "<form" in response.content.decode()
+
+    response = user_client.post(
+        f"/posts/{post.id}/delete_comment/{comment.id}/", **PARTIAL)
+    assert response.status_code == HTTPStatus.NO_CONTENT
+    assert not response.content
+    assert not post.comments.exists()
+
+
+@pytest.mark.django_db
+def test_foreign_comment_fragment_is_forbidden(
+        another_user_client, comment_to_a_post
+):
+    url = (f"/posts/{comment_to_a_post.post_id}/edit_comment/"
+           f"{comment_to_a_post.id}/?partial=1")
+    response = another_user_client.post(url, {"text": "Чужой"})
+    assert response.status_code == HTTPStatus.FORBIDDEN
@@ -0,0 +1,85 @@
+import gzip
+import io
+import json
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from blog import export
+
+
+def read_rows(directory, label):
+    with gzip.open(directory / f"{label}.jsonl.gz", "rt",
+                   encoding="utf-8") as file:
+        return [json.loads(line) for line in file]
+
+
+def run_export(directory, **options):
+    call_command("export_content", str(directory), stdout=io.StringIO(),
+                 **options)
+
+
+@pytest.fixture
+def content(mixer, user, published_category, published_location):
+    posts = mixer.cycle(5).blend(
+        "blog.Post", author=user, category=published_category,
+        location=published_location,
+    )
+    mixer.cycle(3).blend("blog.Comment", post=posts[0], author=user)
+    return posts
+
+
+@pytest.mark.django_db
+def test_export_writes_every_model(tmp_path, content, user):
+    run_export(tmp_path, chunk_size=2)
+
+    posts = read_rows(tmp_path, "blog.post")
+    assert [row["id"] for row in posts] == sorted(
+        post.pk for post in content)
+    assert posts[0]["author_id"] == user.pk
+    assert len(read_rows(tmp_path, "blog.comment")) == 3
+    users = read_rows(tmp_path, "auth.user")
+    assert users[0]["username"] == user.username
+    assert "password" not in users[0]
+    assert export.read_state(tmp_path)["finished"]
+
+    with pytest.raises(CommandError):
+        run_export(tmp_path)
+
+
+@pytest.mark.django_db
+def test_interrupted_export_resumes_without_duplicates(
+        tmp_path, content, monkeypatch
+):
+    write_state = export.write_state
+
+    def crash_on_second_post_chunk(directory, state):
+        if state["models"]["blog.post"]["rows"] == 4:
+            raise RuntimeError("сбой")
+        write_state(directory, state)
+
+    monkeypatch.setattr(export, "write_state", crash_on_second_post_chunk)
+    with pytest.raises(RuntimeError):
+        run_export(tmp_path, chunk_size=2)
+    monkeypatch.setattr(export, "write_state", write_state)
+    saved = export.read_state(tmp_path)["models"]["blog.post"]
+    assert saved["rows"] == 2
+    assert (tmp_path / "blog.post.jsonl.gz").stat().st_size > saved["bytes"]
+
+    run_export(tmp_path, chunk_size=2, resume=True)
+    ids = [row["id"] for row in read_rows(tmp_path, "blog.post")]
+    assert ids == sorted(post.pk for post in content)
+
+
+@pytest.mark.django_db
+def test_incremental_export_takes_rows_after_watermark(
+        tmp_path, content, mixer
+):
+    run_export(tmp_path / "full")
+    new_post = mixer.blend("blog.Post", author=content[0].author,
+                           category=content[0].category)
+
+    run_export(tmp_path / "next", since=str(tmp_path / "full"))
+    assert [row["id"] for row in read_rows(tmp_path / "next",
+                                           "blog.post")] == [new_post.pk]
+    assert read_rows(tmp_path / "next", "blog.comment") == []
@@ -0,0 +1,81 @@
+import pytest
+
+
+@pytest.fixture
+def feed_posts(make_post, another_user):
+    return {
+        "mine": make_post("Мой пост"),
+        "other": make_post("Чужой пост", author=another_user, category=None),
+        "hidden": make_post("Скрытый пост", is_published=False),
+    }
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("kind, content_type", [
+    ("rss", "application/rss+xml"), ("atom", "application/atom+xml"),
+])
+def test_feeds_follow_visibility(client, feed_posts, user, published_category,
+                                 kind, content_type):
+    response = client.get(f"/feed/{kind}/")
+    assert response["Content-Type"].startswith(content_type)
+    body = response.content.decode()
+    assert "Мой пост" in body
+    assert "Скрытый пост" not in body
+    assert "Чужой пост" not in body
+
+    body = client.get(
+        f"/category/{published_category.slug}/{kind}/").content.decode()
+    assert "Мой пост" in body
+
+    body = client.get(f"/profile/{user.username}/{kind}/").content.decode()
+    assert "Мой пост" in body and "Скрытый пост" not in body
+
+
+@pytest.mark.django_db
+def test_unknown_feed_object_is_404(client, feed_posts):
+    assert client.get("/category/missing/rss/").status_code == 404
+    assert client.get("/profile/missing/atom/").status_code == 404
+
+
+@pytest.mark.django_db
+def test_unchanged_feed_poll_is_304_without_queries(
+        client, feed_posts, django_assert_num_queries
+):
+    first = client.get("/feed/atom/")
+    assert first.status_code == 200
+    etag, last_modified = first["ETag"], first["Last-Modified"]
+
+    with django_assert_num_queries(0):
+        response = client.get("/feed/atom/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert response["ETag"] == etag
+
+    with django_assert_num_queries(0):
+        response = client.get("/feed/atom/",
+                              HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == 304
+
+
+@pytest.mark.django_db
+def test_feed_changes_when_post_is_edited(client, feed_posts):
+    etag = client.get("/feed/rss/")["ETag"]
+    post = feed_posts["mine"]
+    post.title = "Новый заголовок"
+    post.save()
+
+    response = client.get("/feed/rss/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+    assert "Новый заголовок" in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_cache_hit_keeps_last_modified(client, feed_posts):
+    first = client.get("/feed/rss/")
+    hit = client.get("/feed/rss/")
+    assert hit["X-Page-Cache"] == "HIT"
+    assert hit["Last-Modified"] == first["Last-Modified"]
+
+    response = client.get("/feed/rss/",
+                          HTTP_IF_MODIFIED_SINCE=hit["Last-Modified"])
+    assert response.status_code == 304
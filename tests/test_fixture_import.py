@@ -0,0 +1,109 @@
+import gzip
+import io
+import json
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+
+from blog.fixture_import import FixtureFormatError, iter_fixture_records
+from blog.models import Category, Comment, Post
+from blog.search import search_posts
+
+
+RECORDS = [
+    {"model": "auth.user", "pk": 501, "fields": {
+        "username": "importer", "password": "!",
+        "date_joined": "2022-12-18T23:00:00Z"}},
+    {"model": "blog.category", "pk": 501, "fields": {
+        "title": "Импорт", "slug": "import", "description": "",
+        "is_published": True, "created_at": "2022-12-18T23:03:52.159Z"}},
+    {"model": "blog.post", "pk": 501, "fields": {
+        "title": "Импортированный пост", "text": "Пришёл из дампа",
+        "pub_date": "2022-12-19T10:00:00Z", "author": 501,
+        "category": 501, "location": None, "image": "",
+        "is_published": True, "created_at": "2022-12-19T09:00:00Z"}},
+    {"model": "blog.comment", "pk": 501, "fields": {
+        "text": "Первый", "post": 501, "author": 501,
+        "created_at": "2022-12-19T11:00:00Z"}},
+    {"model": "blog.comment", "pk": 502, "fields": {
+        "text": "Второй", "post": 501, "author": 501,
+        "created_at": "2022-12-19T12:00:00Z"}},
+]
+
+
+def indexes():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' "
+            "AND sql IS NOT NULL ORDER BY name"
+        )
+        return cursor.fetchall()
+
+
+def test_records_are_read_across_buffer_boundaries():
+    stream = io.StringIO(json.dumps(RECORDS, ensure_ascii=False, indent=2))
+    assert list(iter_fixture_records(stream, read_size=7)) == RECORDS
+    assert list(iter_fixture_records(io.StringIO(" [ ] "))) == []
+
+
+@pytest.mark.parametrize("text", ['{"model": 1}', '[{"a": 1} {"b": 2}]',
+                                  '[{"a": 1},', '[{"a": '])
+def test_malformed_fixture_is_rejected(text):
+    with pytest.raises(FixtureFormatError):
+        list(iter_fixture_records(io.StringIO(text), read_size=4))
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("suffix", [".json", ".json.gz"])
+def test_import_keeps_dates_and_fills_derived_fields(tmp_path, suffix):
+    path = tmp_path / f"dump{suffix}"
+    data = json.dumps(RECORDS).encode()
+    path.write_bytes(gzip.compress(data) if suffix.endswith(".gz") else data)
+    before = indexes()
+    output = io.StringIO()
+
+    call_command("import_fixture", str(path), batch_size=2,
+                 defer_indexes=True, stdout=output)
+
+    assert indexes() == before
+    post = Post.objects.get(pk=501)
+    assert post.created_at.isoformat() == "2022-12-19T09:00:00+00:00"
+    assert Category.objects.get(pk=501).created_at.microsecond == 159000
+    assert post.is_live
+    assert post.comment_count == 2
+    assert Comment.objects.filter(post=post).count() == 2
+    assert [found.pk for found in search_posts("дампа")] == [501]
+    assert "blog.Post" in output.getvalue()
+    assert "строк/с" in output.getvalue()
+
+
+@pytest.mark.django_db
+def test_duplicates_fail_unless_skipped(tmp_path):
+    path = tmp_path / "dump.json"
+    path.write_text(json.dumps(RECORDS[:2]))
+    call_command("import_fixture", str(path), stdout=io.StringIO())
+    with pytest.raises(CommandError):
+        call_command("import_fixture", str(path), stdout=io.StringIO())
+    call_command("import_fixture", str(path), skip_existing=True,
+                 stdout=io.StringIO())
+    assert Category.objects.filter(pk=501).count() == 1
+
+
+@pytest.mark.django_db
+def test_dangling_foreign_key_keeps_only_consistent_batches(tmp_path):
+    path = tmp_path / "dump.json"
+    dangling = {"model": "blog.comment", "pk": 503, "fields": {
+        "text": "Сирота", "post": 999, "author": 501,
+        "created_at": "2022-12-19T13:00:00Z"}}
+    path.write_text(json.dumps(RECORDS + [dangling]))
+
+    with pytest.raises(CommandError, match="частично"):
+        call_command("import_fixture", str(path), batch_size=4,
+                     stdout=io.StringIO())
+
+    assert not Comment.objects.filter(pk=503).exists()
+    post = Post.objects.get(pk=501)
+    assert post.is_live
+    assert post.comment_count == 1
+    assert [found.pk for found in search_posts("дампа")] == [501]
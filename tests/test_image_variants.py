@@ -0,0 +1,61 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.images import ImageFile
+from django.test import override_settings
+from PIL import Image
+
+from blog.images import generate_image_variants
+
+
+@pytest.fixture
+def media_root(tmp_path):
+    with override_settings(MEDIA_ROOT=tmp_path, MEDIA_URL="/media/"):
+        yield tmp_path
+
+
+def make_image(width, height):
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), color=(73, 109, 137)).save(
+        buffer, format="JPEG")
+    return ImageFile(buffer, name="big_photo.jpg")
+
+
+@pytest.mark.django_db
+def test_variants_generated_and_rendered(
+        media_root, mixer, user_client, user, published_category
+):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        location=None, image=make_image(2000, 1000),
+    )
+    assert post.image_variants == {}
+
+    variants = generate_image_variants(post.id)
+    assert variants["card"]["width"] == 640
+    assert variants["card"]["height"] == 320
+    assert variants["detail"]["width"] == 1280
+    assert "image/webp" in {source["type"] for source in variants["sources"]}
+    for name in variants["files"]:
+        assert (media_root / name).exists()
+
+    post.refresh_from_db()
+    assert post.image_variants == variants
+    content = user_client.get("/").content.decode()
+    assert variants["card"]["url"] in content
+    assert 'loading="lazy"' in content
+    assert 'width="640"' in content
+
+    post.image = None
+    post.save()
+    post.refresh_from_db()
+    assert post.image_variants == {}
+    assert not any((media_root / name).exists() for name in variants["files"])
+
+
+@pytest.mark.django_db
+def test_small_image_is_not_upscaled(media_root, mixer, user):
+    post = mixer.blend("blog.Post", author=user, image=make_image(300, 200))
+    variants = generate_image_variants(post.id)
+    assert variants["card"] == variants["detail"]
+    assert variants["card"]["width"] == 300
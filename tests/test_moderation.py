@@ -0,0 +1,97 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.models import Category, Comment, Post
+from blog.moderation import delete_objects, set_published
+from blog.page_cache import get_tag_versions
+from blog.search import search_posts
+from blog.utils import COUNT_GENERATION_KEY
+
+
+@pytest.fixture
+def posts(mixer, published_category):
+    return mixer.cycle(6).blend(
+        "blog.Post", category=published_category, location=None,
+        is_published=True, title="Модерация",
+        pub_date=timezone.now() - timedelta(days=1))
+
+
+@pytest.mark.django_db
+def test_set_published_runs_per_batch_and_invalidates(posts):
+    generation = cache.get_or_set(COUNT_GENERATION_KEY, "old", None)
+    tags = get_tag_versions({f"post:{posts[0].pk}", "feed"})
+    Post.objects.filter(pk=posts[0].pk).update(is_published=False)
+
+    with CaptureQueriesContext(connection) as queries:
+        changed = set_published(Post.objects.all(), False, batch_size=2)
+
+    assert changed == 5
+    assert not Post.objects.filter(is_published=True).exists()
+    updates = [q for q in queries if q["sql"].startswith("UPDATE")]
+    assert len(updates) == 3
+    assert not [q for q in queries if '"blog_post"."id" = ' in q["sql"]]
+    assert cache.get(COUNT_GENERATION_KEY) != generation
+    assert get_tag_versions(set(tags)) != tags
+
+
+@pytest.mark.django_db
+def test_delete_posts_removes_comments_and_search_rows(posts, mixer):
+    mixer.cycle(3).blend("blog.Comment", post=posts[0])
+    assert len(search_posts("модерация")) == 6
+
+    deleted = delete_objects(Post.objects.filter(pk__in=[
+        post.pk for post in posts[:4]
+    ]), batch_size=3)
+
+    assert deleted == 4
+    assert Post.objects.count() == 2
+    assert not Comment.objects.exists()
+    assert len(search_posts("модерация")) == 2
+
+
+@pytest.mark.django_db
+def test_delete_comments_recounts_posts(posts, mixer):
+    kept = mixer.blend("blog.Comment", post=posts[0])
+    mixer.cycle(3).blend("blog.Comment", post=posts[0])
+    mixer.cycle(2).blend("blog.Comment", post=posts[1])
+
+    delete_objects(Comment.objects.exclude(pk=kept.pk))
+
+    assert Post.objects.get(pk=posts[0].pk).comment_count == 1
+    assert Post.objects.get(pk=posts[1].pk).comment_count == 0
+
+
+@pytest.mark.django_db
+def test_delete_category_detaches_posts(posts, published_category):
+    delete_objects(Category.objects.filter(pk=published_category.pk))
+    assert not Category.objects.exists()
+    assert Post.objects.filter(category=None).count() == len(posts)
+
+
+@pytest.mark.django_db
+def test_admin_bulk_actions(admin_client, posts):
+    url = "/admin/blog/post/"
+    pks = [post.pk for post in posts[:2]]
+    response = admin_client.post(url, {
+        "action": "unpublish_selected", "_selected_action": pks,
+    })
+    assert response.status_code == 302
+    assert Post.objects.filter(is_published=False).count() == 2
+
+    confirm = admin_client.post(url, {
+        "action": "delete_selected_in_bulk", "_selected_action": pks,
+    })
+    assert confirm.status_code == 200
+    assert confirm.context["count"] == 2
+    assert Post.objects.count() == len(posts)
+
+    admin_client.post(url, {
+        "action": "delete_selected_in_bulk", "_selected_action": pks,
+        "post": "yes",
+    })
+    assert Post.objects.count() == len(posts) - 2
@@ -0,0 +1,63 @@
+import pytest
+
+from blog.page_cache import page_cache_stats, reset_page_cache_stats
+
+
+@pytest.mark.django_db
+def test_anonymous_feed_is_cached_and_invalidated_by_comment(
+        client, mixer, post_with_published_location
+):
+    reset_page_cache_stats()
+    assert client.get("/")["X-Page-Cache"] == "MISS"
+    assert client.get("/")["X-Page-Cache"] == "HIT"
+    assert page_cache_stats() == {"hits": 1, "misses": 1}
+
+    mixer.blend("blog.Comment", post=post_with_published_location)
+    response = client.get("/")
+    assert response["X-Page-Cache"] == "MISS"
+    assert "(1)" in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_unpublished_category_drops_cached_detail(
+        client, post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    client.get(url)
+    assert client.get(url)["X-Page-Cache"] == "HIT"
+
+    category = post_with_published_location.category
+    category.is_published = False
+    category.save()
+    assert client.get(url).status_code == 404
+
+
+@pytest.mark.django_db
+def test_authenticated_requests_bypass_cache(
+        user_client, post_with_published_location
+):
+    user_client.get("/")
+    assert "X-Page-Cache" not in user_client.get("/")
+
+
+@pytest.mark.django_db
+def test_page_changed_during_render_is_not_cached_as_fresh(
+        client, monkeypatch, post_with_published_location
+):
+    from blog import views
+
+    original = views.get_paginated_posts
+
+    def read_then_edit(*args, **kwargs):
+        page = original(*args, **kwargs)
+        post_with_published_location.title = "Новый заголовок"
+        post_with_published_location.save()
+        return page
+
+    monkeypatch.setattr(views, "get_paginated_posts", read_then_edit)
+    assert "Новый заголовок" not in client.get("/").content.decode()
+    monkeypatch.setattr(views, "get_paginated_posts", original)
+
+    response = client.get("/")
+    assert response["X-Page-Cache"] == "MISS"
+    assert "Новый заголовок" in response.content.decode()
@@ -0,0 +1,68 @@
+from datetime import datetime, timezone
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.utils import encode_key
+from conftest import N_PER_PAGE
+
+OVERSIZED_PK_CURSOR = encode_key(datetime(2020, 1, 1, tzinfo=timezone.utc),
+                                 10 ** 22)
+
+
+@pytest.mark.django_db
+def test_cursor_pagination(user_client, many_posts_with_published_locations):
+    first_page = user_client.get("/").context["page_obj"]
+    assert getattr(first_page, "is_cursor", False)
+    assert len(first_page) == N_PER_PAGE
+    assert first_page.has_next() and not first_page.has_previous()
+
+    second_page = user_client.get(
+        f"/?after={first_page.next_cursor}").context["page_obj"]
+    first_ids = [post.id for post in first_page]
+    second_ids = [post.id for post in second_page]
+    assert len(second_ids) == N_PER_PAGE
+    assert not set(first_ids) & set(second_ids)
+    assert not second_page.has_next() and second_page.has_previous()
+
+    keys = [(post.pub_date, post.id) for post in (*first_page, *second_page)]
+    assert keys == sorted(keys, reverse=True)
+
+    back_page = user_client.get(
+        f"/?before={second_page.previous_cursor}").context["page_obj"]
+    assert [post.id for post in back_page] == first_ids
+    assert not back_page.has_previous()
+
+
+@pytest.mark.django_db
+def test_legacy_page_numbers_and_bad_cursor(
+        user_client, many_posts_with_published_locations
+):
+    page_obj = user_client.get("/?page=2").context["page_obj"]
+    assert not getattr(page_obj, "is_cursor", False)
+    assert page_obj.number == 2
+    assert len(page_obj) == N_PER_PAGE
+
+    for cursor in ("not-a-cursor", OVERSIZED_PK_CURSOR):
+        response = user_client.get(f"/?after={cursor}")
+        assert response.status_code == 200
+        assert len(response.context["page_obj"]) == N_PER_PAGE
+
+
+def _count_queries(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        client.get(url)
+    return [q["sql"] for q in queries if "COUNT(" in q["sql"]]
+
+
+@pytest.mark.django_db
+def test_page_count_is_cached_and_invalidated(
+        user_client, mixer, many_posts_with_published_locations
+):
+    assert _count_queries(user_client, "/?page=2")
+    assert not _count_queries(user_client, "/?page=2")
+
+    post = many_posts_with_published_locations[0]
+    mixer.blend("blog.Post", author=post.author, category=post.category)
+    assert _count_queries(user_client, "/?page=2")
@@ -0,0 +1,27 @@
+import pytest
+
+from blog.models import Post
+
+
+@pytest.mark.django_db
+def test_post_card_fragment_is_reused_until_post_changes(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    assert post.title in user_client.get("/").content.decode()
+
+    Post.objects.filter(pk=post.pk).update(title="Stale title")
+    assert "Stale title" not in user_client.get("/").content.decode()
+
+    post.title = "Fresh title"
+    post.save()
+    assert "Fresh title" in user_client.get("/").content.decode()
+
+
+@pytest.mark.django_db
+def test_post_card_fragment_follows_comment_count(
+        user_client, mixer, post_with_published_location
+):
+    assert "(0)" in user_client.get("/").content.decode()
+    mixer.blend("blog.Comment", post=post_with_published_location)
+    assert "(1)" in user_client.get("/").content.decode()
@@ -0,0 +1,72 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.utils import NUM_COMMENTS_TO_DISPLAY, remember_next_release
+
+
+def post_queries(client, url):
+    cache.clear()
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    return response, [
+        q["sql"] for q in queries if q["sql"].startswith(
+            'SELECT "blog_post"."id"')
+    ]
+
+
+@pytest.mark.django_db
+def test_post_detail_loads_post_once(
+        client, user_client, another_user_client, post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    for visitor in (client, user_client, another_user_client):
+        response, queries = post_queries(visitor, url)
+        assert response.status_code == 200
+        assert len(queries) == 1
+
+
+@pytest.mark.django_db
+def test_hidden_post_visible_only_to_author(
+        user_client, another_user_client, post_with_published_location
+):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    url = f"/posts/{post.id}/"
+
+    response, queries = post_queries(another_user_client, url)
+    assert response.status_code == 404
+    assert len(queries) == 1
+    assert user_client.get(url).status_code == 200
+
+    response = another_user_client.post(
+        f"/posts/{post.id}/comment/", data={"text": "hidden"})
+    assert response.status_code == 404
+    assert not post.comments.exists()
+
+
+@pytest.mark.django_db
+def test_comments_are_paginated_with_authors_joined(
+        client, mixer, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(NUM_COMMENTS_TO_DISPLAY + 5).blend("blog.Comment", post=post)
+    cache.clear()
+    remember_next_release()
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(f"/posts/{post.id}/")
+    assert len(queries) == 2
+    comments = response.context["comments"]
+    assert len(comments) == NUM_COMMENTS_TO_DISPLAY
+    assert comments.has_next()
+
+    more = client.get(
+        f"/posts/{post.id}/comments/?after={comments.next_cursor}")
+    assert more.status_code == 200
+    rest = list(more.context["comments"])
+    assert len(rest) == 5
+    assert not more.context["comments"].has_next()
+    shown = [c.id for c in comments] + [c.id for c in rest]
+    assert sorted(shown) == sorted(post.comments.values_list("id", flat=True))
@@ -0,0 +1,49 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import override_settings
+
+from blog.instrumentation import (
+    QueryBudgetExceeded, RequestMetricsMiddleware, query_budget,
+)
+
+
+@pytest.fixture(autouse=True)
+def strict_budgets():
+    with override_settings(QUERY_BUDGET_STRICT=True):
+        yield
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("client_name", [
+    "unlogged_client", "user_client", "another_user_client"])
+def test_feed_views_stay_within_query_budget(
+        request, client_name, user, published_category,
+        many_posts_with_published_locations,
+):
+    client = request.getfixturevalue(client_name)
+    for url in (
+        "/",
+        "/?page=2",
+        f"/category/{published_category.slug}/",
+        f"/profile/{user.username}/",
+    ):
+        response = client.get(url)
+        assert response.status_code == 200, url
+        assert 'desc="' in response["Server-Timing"]
+
+
+@pytest.mark.django_db
+def test_exceeded_budget_raises_in_strict_mode(rf):
+    @query_budget(0)
+    def view(request):
+        get_user_model().objects.count()
+        return HttpResponse()
+
+    def get_response(request):
+        middleware.process_view(request, view, (), {})
+        return view(request)
+
+    middleware = RequestMetricsMiddleware(get_response)
+    with pytest.raises(QueryBudgetExceeded):
+        middleware(rf.get("/"))
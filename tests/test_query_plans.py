@@ -0,0 +1,54 @@
+import pytest
+from django.db import connection
+from django.db.models import Q
+
+from blog.models import Comment, Post
+from blog.utils import NUM_POSTS_TO_DISPLAY, get_published_posts
+
+
+def explain(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def assert_indexed_plan(queryset):
+    plan = explain(queryset)
+    for step in plan:
+        assert "TEMP B-TREE" not in step, plan
+        if step.startswith("SCAN "):
+            assert " USING " in step, plan
+
+
+@pytest.mark.django_db
+def test_feed_queries_use_indexes(
+        user, many_posts_with_published_locations, published_category
+):
+    if connection.vendor != "sqlite":
+        pytest.skip("EXPLAIN QUERY PLAN is SQLite-specific")
+    post = many_posts_with_published_locations[0]
+    page = slice(0, NUM_POSTS_TO_DISPLAY + 1)
+    after_cursor = (
+        Q(pub_date__lt=post.pub_date)
+        | Q(pub_date=post.pub_date, pk__lt=post.pk)
+    )
+    feeds = {
+        "index": get_published_posts(),
+        "category": get_published_posts().filter(
+            category=published_category),
+        "profile": get_published_posts().filter(author=user),
+        "own profile": user.posts.all(),
+    }
+    for name, posts in feeds.items():
+        ordered = posts.order_by("-pub_date", "-pk")
+        assert_indexed_plan(ordered[page])
+        assert_indexed_plan(ordered.filter(after_cursor)[page])
+    assert_indexed_plan(Comment.objects.filter(post=post))
+    assert_indexed_plan(
+        post.comments.select_related("author").filter(
+            Q(created_at__gt=post.created_at)
+            | Q(created_at=post.created_at, pk__gt=1)
+        ).order_by("created_at", "pk")[:NUM_POSTS_TO_DISPLAY])
+    assert_indexed_plan(
+        Post.objects.filter(is_live=False).order_by("pub_date")[:1])
@@ -0,0 +1,81 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.management.commands.publish_scheduled import (
+    next_release_at, release_due_posts,
+)
+from blog.models import Post
+from blog.scheduling import release_is_due
+from blog.utils import remember_next_release
+
+
+@pytest.mark.django_db
+def test_future_post_released_by_scheduler(
+        user_client, mixer, user, published_category
+):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=timezone.now() + timedelta(hours=1),
+    )
+    assert not post.is_live
+    assert next_release_at() == post.pub_date
+    assert post not in user_client.get("/").context["page_obj"]
+
+    Post.objects.filter(pk=post.pk).update(
+        pub_date=timezone.now() - timedelta(seconds=1))
+    assert release_due_posts() == [post.pk]
+    assert post in user_client.get("/").context["page_obj"]
+    assert next_release_at() is None
+
+
+@pytest.mark.django_db
+def test_due_post_released_on_request_without_worker(
+        client, mixer, user, published_category, monkeypatch
+):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=timezone.now() + timedelta(hours=1),
+    )
+    assert post not in client.get("/").context["page_obj"]
+    assert not release_is_due()
+
+    later = timezone.now() + timedelta(hours=2)
+    monkeypatch.setattr(timezone, "now", lambda: later)
+    assert post in client.get("/").context["page_obj"]
+    post.refresh_from_db()
+    assert post.is_live
+    assert not release_is_due()
+
+
+@pytest.mark.django_db
+def test_publish_scheduled_command_runs_once(mixer, user):
+    post = mixer.blend("blog.Post", author=user, pub_date=timezone.now())
+    Post.objects.filter(pk=post.pk).update(is_live=False)
+
+    call_command("publish_scheduled")
+
+    post.refresh_from_db()
+    assert post.is_live
+
+
+@pytest.mark.django_db
+def test_bulk_created_posts_are_fixed_without_worker(
+        client, mixer, user, published_category
+):
+    client.get("/")
+    yesterday = timezone.now() - timedelta(days=1)
+    fields = {"author": user, "category": published_category,
+              "text": "", "is_published": True}
+    Post.objects.bulk_create([
+        Post(title="Вчерашний", pub_date=yesterday, **fields),
+        Post(title="Завтрашний", is_live=True,
+             pub_date=timezone.now() + timedelta(days=1), **fields),
+    ])
+    remember_next_release()
+
+    page = client.get("/").context["page_obj"]
+    assert [post.title for post in page] == ["Вчерашний"]
+    assert not Post.objects.get(title="Завтрашний").is_live
@@ -0,0 +1,97 @@
+from base64 import urlsafe_b64encode
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.models import Post
+from blog.search import build_match_query, decode_rank_cursor, search_posts
+
+
+def found(query, **kwargs):
+    return [post.title for post in search_posts(query, **kwargs)]
+
+
+def test_build_match_query_quotes_terms():
+    assert build_match_query('кот OR "пёс*"') == '"кот" "OR" "пес"'
+    assert build_match_query("  ... ") is None
+
+
+@pytest.mark.parametrize("raw", [
+    "1.0|99999999999999999999999", "nan|1", "inf|1", "1.0|x",
+])
+def test_decode_rank_cursor_rejects_out_of_range_values(raw):
+    token = urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+    assert decode_rank_cursor(token) is None
+
+
+@pytest.mark.django_db
+def test_search_ranks_and_hides_unpublished(make_post, mixer):
+    make_post("Рецепт борща", "Свёкла и капуста")
+    make_post("Заметки", "Вчера варили борщ, а не щи")
+    make_post("Скрытый борщ", is_published=False)
+    make_post("Будущий борщ", pub_date=timezone.now() + timedelta(days=1))
+    make_post("Борщ в скрытой категории",
+              category=mixer.blend("blog.Category", is_published=False))
+
+    assert found("борщ") == ["Заметки"]
+    assert found("Борща") == ["Рецепт борща"]
+    assert found("свекла") == ["Рецепт борща"]
+    assert found("борщ щи") == ["Заметки"]
+
+
+@pytest.mark.django_db
+def test_search_index_follows_edits_and_deletes(make_post):
+    post = make_post("Старый заголовок")
+    post.title = "Новый заголовок"
+    post.save()
+    assert found("старый") == []
+    assert found("новый") == ["Новый заголовок"]
+
+    post.delete()
+    assert found("новый") == []
+
+
+@pytest.mark.django_db
+def test_search_cursor_pages(make_post):
+    for number in range(5):
+        make_post(f"Кот {number}", "кот " * (number + 1))
+    first = search_posts("кот", per_page=3)
+    assert first.has_next()
+    second = search_posts("кот", after=(first[-1].rank, first[-1].pk),
+                          per_page=3)
+    assert not second.has_next() and second.has_previous()
+    ranked = [(post.rank, post.pk) for post in (*first, *second)]
+    assert len(ranked) == 5
+    assert ranked == sorted(ranked)
+
+
+@pytest.mark.django_db
+def test_search_view_and_rebuild_command(client, make_post):
+    make_post("Ёлка")
+    Post.objects.update(title="Сосна")
+    call_command("rebuild_search_index", verbosity=0)
+    assert found("ёлка") == []
+
+    response = client.get("/search/", {"q": "сосна"})
+    assert response.status_code == 200
+    assert [post.title for post in response.context["page_obj"]] == ["Сосна"]
+
+    oversized = urlsafe_b64encode(b"1.0|99999999999999999999999").decode()
+    response = client.get("/search/", {"q": "сосна", "after": oversized})
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_search_query_starts_from_fulltext_index(make_post):
+    make_post("Кот")
+    with CaptureQueriesContext(connection) as queries:
+        search_posts("кот")
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {queries[-1]['sql']}")
+        plan = [row[-1] for row in cursor.fetchall()]
+    assert "VIRTUAL TABLE INDEX" in plan[0], plan
+    assert not [step for step in plan[1:] if step.startswith("SCAN")], plan
@@ -0,0 +1,84 @@
+import gzip
+
+import pytest
+
+from blog import sitemaps
+
+
+def read(response):
+    return b"".join(response.streaming_content).decode()
+
+
+@pytest.fixture
+def sitemap_posts(make_post):
+    return {
+        "shown": make_post("Видимый пост"),
+        "hidden": make_post("Скрытый пост", is_published=False),
+    }
+
+
+@pytest.mark.django_db
+def test_index_lists_chunks_of_every_section(client, sitemap_posts):
+    body = client.get("/sitemap.xml").content.decode()
+    for section in ("posts", "categories", "profiles"):
+        assert f"/sitemap-{section}-0.xml" in body
+
+
+@pytest.mark.django_db
+def test_chunk_follows_visibility(client, sitemap_posts, user,
+                                  published_category):
+    body = read(client.get("/sitemap-posts-0.xml"))
+    assert f"/posts/{sitemap_posts['shown'].pk}/</loc>" in body
+    assert f"/posts/{sitemap_posts['hidden'].pk}/<" not in body
+    assert "<lastmod>" in body
+
+    body = read(client.get("/sitemap-categories-0.xml"))
+    assert f"/category/{published_category.slug}/</loc>" in body
+    body = read(client.get("/sitemap-profiles-0.xml"))
+    assert f"/profile/{user.username}/</loc>" in body
+
+
+@pytest.mark.django_db
+def test_chunk_is_served_gzipped_when_accepted(client, sitemap_posts):
+    plain = client.get("/sitemap-posts-0.xml")
+    assert "Content-Encoding" not in plain
+    assert plain["Vary"] == "Accept-Encoding"
+
+    response = client.get("/sitemap-posts-0.xml",
+                          HTTP_ACCEPT_ENCODING="gzip, br")
+    assert response["Content-Encoding"] == "gzip"
+    assert gzip.decompress(response.content).decode() == read(plain)
+
+
+@pytest.mark.django_db
+def test_unknown_chunk_is_404(client, sitemap_posts):
+    assert client.get("/sitemap-missing-0.xml").status_code == 404
+    assert client.get("/sitemap-posts-5.xml").status_code == 404
+
+
+@pytest.mark.django_db
+def test_only_changed_chunk_is_rebuilt(
+        client, monkeypatch, mixer, sitemap_posts, django_assert_num_queries
+):
+    monkeypatch.setattr(sitemaps, "SITEMAP_CHUNK_SIZE", 1)
+    shown = sitemap_posts["shown"]
+    neighbour = mixer.blend(
+        "blog.Post", is_published=True, author=shown.author,
+        category=shown.category, location=None, pub_date=shown.pub_date,
+    )
+    first = f"/sitemap-posts-{shown.pk}.xml"
+    second = f"/sitemap-posts-{neighbour.pk}.xml"
+    client.get(first)
+    client.get(second)
+
+    neighbour.title = "Новый заголовок"
+    neighbour.save()
+    with django_assert_num_queries(0):
+        assert client.get(first).status_code == 200
+    response = client.get(second)
+    assert response.status_code == 200
+
+    neighbour.is_published = False
+    neighbour.save()
+    body = read(client.get(second))
+    assert f"/posts/{neighbour.pk}/" not in body
@@ -0,0 +1,71 @@
+import gzip
+import json
+
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+
+from blog.storage import accepted_encodings
+from blog.views import serve_static
+
+
+CSS = b"body { color: #222; }\n" * 100
+
+
+@pytest.fixture
+def collected(tmp_path):
+    source = tmp_path / "src"
+    (source / "css").mkdir(parents=True)
+    (source / "css" / "site.css").write_bytes(CSS)
+    (source / "css" / "tiny.css").write_bytes(b"a{}")
+    root = tmp_path / "static"
+    with override_settings(
+        STATICFILES_DIRS=[source],
+        STATIC_ROOT=root,
+        STATICFILES_STORAGE=(
+            "blog.storage.CompressedManifestStaticFilesStorage"
+        ),
+    ):
+        call_command("collectstatic", interactive=False, verbosity=0)
+        manifest = json.loads((root / "staticfiles.json").read_text())
+        yield root, manifest["paths"]
+
+
+def test_collectstatic_writes_hashed_gzip_copies(collected):
+    root, paths = collected
+    hashed = paths["css/site.css"]
+    assert hashed != "css/site.css"
+    assert gzip.decompress((root / f"{hashed}.gz").read_bytes()) == CSS
+    assert not (root / f"{paths['css/tiny.css']}.gz").exists()
+    assert not (root / "css/site.css.gz").exists()
+
+
+def test_serve_static_negotiates_encoding(collected, rf):
+    _, paths = collected
+    hashed = paths["css/site.css"]
+
+    response = serve_static(
+        rf.get("/", HTTP_ACCEPT_ENCODING="deflate, gzip;q=0.8"), hashed
+    )
+    assert response["Content-Encoding"] == "gzip"
+    assert response["Content-Type"].startswith("text/css")
+    assert response["Vary"] == "Accept-Encoding"
+    assert "immutable" in response["Cache-Control"]
+    assert gzip.decompress(b"".join(response.streaming_content)) == CSS
+
+    response = serve_static(
+        rf.get("/", HTTP_ACCEPT_ENCODING="gzip;q=0"), hashed
+    )
+    assert not response.has_header("Content-Encoding")
+    assert b"".join(response.streaming_content) == CSS
+
+
+def test_unhashed_static_is_not_immutable(collected, rf):
+    response = serve_static(rf.get("/"), "css/site.css")
+    assert "Cache-Control" not in response
+
+
+def test_accepted_encodings():
+    assert accepted_encodings("br;q=1.0, gzip, identity;q=0") == {
+        "br", "gzip",
+    }
@@ -0,0 +1,40 @@
+import hashlib
+
+import pytest
+from django.core.files.base import ContentFile
+from django.test import override_settings
+
+from blog.models import Post
+from blog.storage import ContentAddressedStorage
+
+
+@pytest.fixture
+def media_root(tmp_path):
+    with override_settings(MEDIA_ROOT=tmp_path):
+        yield tmp_path
+
+
+def test_identical_content_is_stored_once(media_root):
+    storage = ContentAddressedStorage()
+    digest = hashlib.sha256(b"image-bytes").hexdigest()
+
+    first = storage.save("Photo.JPG", ContentFile(b"image-bytes"))
+    second = storage.save("other.jpg", ContentFile(b"image-bytes"))
+
+    assert first == second == f"{digest[:2]}/{digest[2:4]}/{digest}.jpg"
+    assert ContentAddressedStorage.is_hashed_name(first)
+    assert len(list(media_root.rglob("*.jpg"))) == 1
+
+
+@pytest.mark.django_db
+def test_post_images_served_with_immutable_headers(
+        media_root, client, mixer, user
+):
+    post = mixer.blend("blog.Post", author=user,
+                       image=ContentFile(b"GIF89a", name="pic.gif"))
+    assert Post._meta.get_field("image").storage.is_hashed_name(
+        post.image.name)
+    with override_settings(MEDIA_ROOT=media_root):
+        response = client.get(f"/media/{post.image.name}")
+    assert response.status_code == 200
+    assert "immutable" in response["Cache-Control"]
@@ -0,0 +1,74 @@
+import json
+from collections import Counter
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db.models import Sum
+
+from blog import urls as blog_urls
+from blog.management.commands.bench_views import iter_url_patterns
+from blog.models import Comment, Post
+from blog.search import search_posts
+from blog.synthetic import WORDS
+from pages import urls as pages_urls
+
+
+def generate(**options):
+    volumes = {"users": 10, "categories": 4, "locations": 3, "posts": 300,
+               "comments": 400}
+    volumes.update(options)
+    call_command("generate_content", stdout=StringIO(), **volumes)
+
+
+@pytest.mark.django_db
+def test_generated_content_is_skewed_and_consistent():
+    generate()
+    assert Post.objects.count() == 300
+    assert Post.objects.filter(is_live=False).exists()
+    assert Post.objects.filter(is_published=False).exists()
+    authors = Counter(Post.objects.values_list("author_id", flat=True))
+    assert authors.most_common(1)[0][1] > 300 / 10 * 2
+    assert Post.objects.aggregate(
+        total=Sum("comment_count"))["total"] == Comment.objects.count()
+    assert not Comment.objects.filter(post__is_live=False).exists()
+    assert any(list(search_posts(word)) for word in WORDS)
+
+    with pytest.raises(CommandError):
+        generate()
+
+
+@pytest.mark.django_db
+def test_same_seed_gives_same_content():
+    generate(prefix="first")
+    first = list(Post.objects.order_by("pk").values_list("title", flat=True))
+    generate(prefix="second")
+    second = list(Post.objects.order_by("pk").values_list(
+        "title", flat=True))[len(first):]
+    assert first == second
+
+
+@pytest.mark.django_db
+def test_bench_views_covers_every_url(tmp_path):
+    generate(posts=50, comments=100)
+    report = tmp_path / "bench.json"
+    cache.set("blog:test:marker", 1)
+    call_command("bench_views", iterations=2, cold=True,
+                 json_path=str(report), stdout=StringIO())
+    assert cache.get("blog:test:marker") == 1
+    views = json.loads(report.read_text(encoding="utf-8"))["views"]
+
+    names = {name for module in (blog_urls, pages_urls)
+             for name, _ in iter_url_patterns(module)}
+    assert set(views) == names
+    assert views["blog:index"]["status"] == 200
+    assert views["blog:edit_comment"]["status"] == 200
+    for stats in views.values():
+        assert stats["p50_ms"] <= stats["p99_ms"]
+        assert stats["queries"] >= 0
+
+    out = StringIO()
+    call_command("bench_views", iterations=2, compare=str(report),
+                 stdout=out)
+    assert "p95 " in out.getvalue() and "%" in out.getvalue()
@@ -0,0 +1,48 @@
+import json
+import logging
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.template import TemplateSyntaxError
+
+from blog import templating
+from blog.templating import iter_template_names, warm_template_cache
+
+
+def test_warm_template_cache_compiles_project_templates():
+    names = set(iter_template_names())
+    assert {"blog/index.html", "includes/post_card.html"} <= names
+    compiled, errors = warm_template_cache()
+    assert not errors
+    assert compiled == len(names)
+
+
+def test_startup_warmup_logs_broken_templates(monkeypatch, caplog):
+    monkeypatch.setattr(templating, "warm_template_cache", lambda: (
+        3, [("blog/broken.html", TemplateSyntaxError("Unclosed tag"))]
+    ))
+    with caplog.at_level(logging.INFO, logger="blog.templating"):
+        templating.warm_templates_on_startup()
+    errors = [r for r in caplog.records if r.levelno == logging.ERROR]
+    assert len(errors) == 1
+    assert "blog/broken.html" in errors[0].getMessage()
+
+
+def test_bench_templates_reports_per_template_times(tmp_path):
+    report = tmp_path / "bench.json"
+    call_command(
+        "bench_templates", iterations=1, comments=5, json_path=str(report),
+        stdout=StringIO(),
+    )
+    results = json.loads(report.read_text(encoding="utf-8"))
+    assert results["feed"]["templates"]["includes/post_card.html"][
+        "renders_per_page"] == 10
+    assert "includes/comments.html" in results["detail"]["templates"]
+
+
+def test_bench_templates_leaves_shared_cache_alone():
+    cache.set("blog:test:marker", 1)
+    call_command("bench_templates", iterations=1, comments=1,
+                 stdout=StringIO())
+    assert cache.get("blog:test:marker") == 1
@@ -0,0 +1,60 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.utils import timezone
+from PIL import Image
+
+from blog.forms import PostForm
+from blog.models import Post
+
+
+def image_upload(size=(100, 100), image_format="JPEG", name="photo.jpg"):
+    buffer = BytesIO()
+    Image.new("RGB", size).save(buffer, image_format)
+    return SimpleUploadedFile(name, buffer.getvalue())
+
+
+def post_data(category):
+    return {
+        "title": "Заголовок",
+        "text": "Текст",
+        "pub_date": timezone.now().strftime("%Y-%m-%dT%H:%M"),
+        "category": category.id,
+        "is_published": True,
+    }
+
+
+@pytest.mark.django_db
+def test_oversized_upload_rejected_with_form_error(
+        user_client, published_category
+):
+    with override_settings(UPLOAD_MAX_FILE_SIZE=1024):
+        response = user_client.post(
+            "/posts/create/",
+            {**post_data(published_category),
+             "image": image_upload((600, 600), "PNG", "big.png")},
+        )
+    assert response.status_code == 200
+    assert "Файл слишком большой" in response.content.decode()
+    assert not Post.objects.exists()
+
+
+@pytest.mark.django_db
+def test_header_checks_reject_before_decoding(published_category):
+    with override_settings(POST_IMAGE_MAX_PIXELS=50 * 50):
+        form = PostForm(post_data(published_category),
+                        files={"image": image_upload((100, 100))})
+        assert not form.is_valid()
+        assert "Слишком большое изображение" in form.errors["image"][0]
+
+    form = PostForm(post_data(published_category),
+                    files={"image": image_upload(image_format="BMP",
+                                                 name="photo.bmp")})
+    assert not form.is_valid()
+    assert "Поддерживаются только форматы" in form.errors["image"][0]
+
+    form = PostForm(post_data(published_category),
+                    files={"image": image_upload()})
+    assert form.is_valid(), form.errors